@@ -165,6 +165,10 @@ class BaseEconomics:
         self.percentage_penalty_coefficient = percentage_penalty_coefficient
         self.reward_coefficient = reward_coefficient
 
+        # Deployment parameters are derived once, on first access
+        self._staking_deployment_parameters = None
+        self._slashing_deployment_parameters = None
+
     @property
     def erc20_initial_supply(self) -> int:
         return int(self.initial_supply)
@@ -180,6 +184,8 @@ class BaseEconomics:
     @property
     def staking_deployment_parameters(self) -> Tuple[int, ...]:
         """Cast coefficient attributes to uint256 compatible type for solidity+EVM"""
+        if self._staking_deployment_parameters is not None:
+            return self._staking_deployment_parameters
         deploy_parameters = (
 
             # Period
@@ -196,11 +202,14 @@ class BaseEconomics:
             self.maximum_allowed_locked,      # Max amount of tokens that can be locked
             self.minimum_worker_periods       # Min amount of periods while a worker can't be changed
         )
-        return tuple(map(int, deploy_parameters))
+        self._staking_deployment_parameters = tuple(map(int, deploy_parameters))
+        return self._staking_deployment_parameters
 
     @property
     def slashing_deployment_parameters(self) -> Tuple[int, ...]:
         """Cast coefficient attributes to uint256 compatible type for solidity+EVM"""
+        if self._slashing_deployment_parameters is not None:
+            return self._slashing_deployment_parameters
         deployment_parameters = [
             self.hash_algorithm,
             self.base_penalty,
@@ -208,7 +217,8 @@ class BaseEconomics:
             self.percentage_penalty_coefficient,
             self.reward_coefficient
         ]
-        return tuple(map(int, deployment_parameters))
+        self._slashing_deployment_parameters = tuple(map(int, deployment_parameters))
+        return self._slashing_deployment_parameters
 
     @property
     def worklock_deployment_parameters(self):
@@ -315,6 +325,9 @@ class StandardTokenEconomics(BaseEconomics):
         self.token_saturation = reward_saturation
         self.small_stake_multiplier = small_stake_multiplier
 
+        # Token supply per period is derived on demand, and memoized
+        self._token_supply_at_period = dict()
+
         super().__init__(initial_supply=initial_supply,
                          total_supply=total_supply,
                          staking_coefficient=staking_coefficient,
@@ -325,6 +338,10 @@ class StandardTokenEconomics(BaseEconomics):
     def token_supply_at_period(self, period: int) -> int:
         if period < 0:
             raise ValueError("Period must be a positive integer")
+        try:
+            return self._token_supply_at_period[period]
+        except KeyError:
+            pass
 
         with localcontext() as ctx:
             ctx.prec = self._precision
@@ -342,7 +359,8 @@ class StandardTokenEconomics(BaseEconomics):
             T_half_in_days = T_half * 365
 
             S_t = S_0 + I_0 * T_half * (1 - 2**(-t / T_half_in_days)) / LOG2
-            return int(S_t)
+            self._token_supply_at_period[period] = int(S_t)
+            return self._token_supply_at_period[period]
 
     def cumulative_rewards_at_period(self, period: int) -> int:
         return self.token_supply_at_period(period) - self.erc20_initial_supply
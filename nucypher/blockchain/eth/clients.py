@@ -22,6 +22,7 @@ from geth.chain import (
 from geth.process import BaseGethProcess
 from twisted.logger import Logger
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 
 from nucypher.config.constants import DEFAULT_CONFIG_ROOT, DEPLOY_DIR, USER_LOG_DIR
 
@@ -397,6 +398,7 @@ class InfuraClient(Web3Client):
 class EthereumTesterClient(Web3Client):
 
     is_local = True
+    RECEIPT_POLL_LATENCY = 0.001  # seconds
 
     def unlock_account(self, address, password, duration: int = None) -> bool:
         """Returns True if the testing backend keyring has control of the given address."""
@@ -421,6 +423,15 @@ class EthereumTesterClient(Web3Client):
     def sync(self, *args, **kwargs):
         return True
 
+    def wait_for_receipt(self, transaction_hash: str, timeout: int) -> dict:
+        # eth-tester mines transactions as soon as they are sent, so there is usually nothing to wait for
+        try:
+            return self.w3.eth.getTransactionReceipt(transaction_hash)
+        except TransactionNotFound:
+            return self.w3.eth.waitForTransactionReceipt(transaction_hash=transaction_hash,
+                                                         timeout=timeout,
+                                                         poll_latency=self.RECEIPT_POLL_LATENCY)
+
     def new_account(self, password: str) -> str:
         insecure_account = self.w3.provider.ethereum_tester.add_account(private_key=os.urandom(32).hex(),
                                                                         password=password)
@@ -547,6 +547,7 @@ class BlockchainDeployerInterface(BlockchainInterface):
     def __init__(self, compiler: SolidityCompiler = None, ignore_solidity_check: bool = False, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.compiler = compiler or SolidityCompiler(ignore_solidity_check=ignore_solidity_check)
+        self._contract_factories = dict()
 
     def connect(self):
         super().connect()
@@ -561,6 +562,7 @@ class BlockchainDeployerInterface(BlockchainInterface):
         else:
             _raw_contract_cache = NO_COMPILATION_PERFORMED
         self._raw_contract_cache = _raw_contract_cache
+        self._contract_factories = dict()
 
     @validate_checksum_address
     def deploy_contract(self,
@@ -616,10 +618,7 @@ class BlockchainDeployerInterface(BlockchainInterface):
         # Instantiate & Enroll contract
         #
 
-        contract = self.client.w3.eth.contract(address=address,
-                                               abi=contract_factory.abi,
-                                               version=contract_factory.version,
-                                               ContractFactoryClass=self._contract_factory)
+        contract = contract_factory(address=address)
 
         if enroll is True:
             registry.enroll(contract_name=contract_name,
@@ -667,11 +666,16 @@ class BlockchainDeployerInterface(BlockchainInterface):
 
     def get_contract_factory(self, contract_name: str, version: str = 'latest') -> VersionedContract:
         """Retrieve compiled interface data from the cache and return web3 contract"""
-        version, interface = self.find_raw_contract_data(contract_name, version)
+        try:
+            return self._contract_factories[(contract_name, version)]
+        except KeyError:
+            pass
+        resolved_version, interface = self.find_raw_contract_data(contract_name, version)
         contract = self.client.w3.eth.contract(abi=interface['abi'],
                                                bytecode=interface['bin'],
-                                               version=version,
+                                               version=resolved_version,
                                                ContractFactoryClass=self._contract_factory)
+        self._contract_factories[(contract_name, version)] = contract
         return contract
 
     def _wrap_contract(self,
@@ -15,6 +15,7 @@ You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 import collections
+import hashlib
 import os
 import re
 from typing import List, Set
@@ -131,13 +132,27 @@ class SolidityCompiler:
                     existence_data.update({version: data})
         return interfaces
 
-    def _compile(self, root_source_dir: str, other_source_dirs: [str]) -> dict:
-        """Executes the compiler with parameters specified in the json config"""
-
-        self.log.info("Using solidity compiler binary at {}".format(self.__sol_binary_path))
+    def source_digest(self) -> str:
+        """
+        Returns a hex digest of all solidity sources, imported libraries and compilation settings;
+        Equal digests produce equal compilation output.
+        """
+        digest = hashlib.sha256()
+        digest.update(SOLIDITY_COMPILER_VERSION.encode())
+        digest.update(str(self.optimization_runs).encode())
+        for root_source_dir, other_source_dirs in self.source_dirs:
+            if root_source_dir is None:
+                continue
+            source_paths = self._collect_source_paths(root_source_dir, other_source_dirs)
+            library_paths = self._collect_library_paths(root_source_dir)
+            for path in sorted(source_paths | library_paths):
+                digest.update(path.encode())
+                with open(path, 'rb') as source_file:
+                    digest.update(source_file.read())
+        return digest.hexdigest()
+
+    def _collect_source_paths(self, root_source_dir: str, other_source_dirs: [str]) -> Set[str]:
         contracts_dir = os.path.join(root_source_dir, self.__compiled_contracts_dir)
-        self.log.info("Compiling solidity source files at {}".format(contracts_dir))
-
         source_paths = set()
         source_walker = os.walk(top=contracts_dir, topdown=True)
         if other_source_dirs is not None:
@@ -151,6 +166,26 @@ class SolidityCompiler:
                     path = os.path.join(root, filename)
                     source_paths.add(path)
                     self.log.debug("Collecting solidity source {}".format(path))
+        return source_paths
+
+    def _collect_library_paths(self, root_source_dir: str) -> Set[str]:
+        """Collects library sources, which are only compiled when imported through the zeppelin remapping"""
+        zeppelin_dir = os.path.join(root_source_dir, self.__zeppelin_library_dir)
+        library_paths = set()
+        for root, dirs, files in os.walk(top=zeppelin_dir, topdown=True):
+            for filename in files:
+                if filename.endswith('.sol'):
+                    library_paths.add(os.path.join(root, filename))
+        return library_paths
+
+    def _compile(self, root_source_dir: str, other_source_dirs: [str]) -> dict:
+        """Executes the compiler with parameters specified in the json config"""
+
+        self.log.info("Using solidity compiler binary at {}".format(self.__sol_binary_path))
+        contracts_dir = os.path.join(root_source_dir, self.__compiled_contracts_dir)
+        self.log.info("Compiling solidity source files at {}".format(contracts_dir))
+
+        source_paths = self._collect_source_paths(root_source_dir, other_source_dirs)
 
         # Compile with remappings: https://github.com/ethereum/py-solc
         zeppelin_dir = os.path.join(root_source_dir, self.__zeppelin_library_dir)
@@ -17,6 +17,7 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import os
+from contextlib import contextmanager
 from typing import List
 from typing import Tuple
 
@@ -86,6 +87,8 @@ class TesterBlockchain(BlockchainDeployerInterface):
 
     _default_token_economics = StandardTokenEconomics()
 
+    _COMPILATION_CACHE_KEY = 'nucypher/compiled_contracts'
+
     def __init__(self,
                  test_accounts=None,
                  poa=True,
@@ -93,11 +96,13 @@ class TesterBlockchain(BlockchainDeployerInterface):
                  eth_airdrop=False,
                  free_transactions=False,
                  compiler: SolidityCompiler = None,
+                 compilation_cache=None,
                  *args, **kwargs):
 
         if not test_accounts:
             test_accounts = self._default_test_accounts
         self.free_transactions = free_transactions
+        self.compilation_cache = compilation_cache
 
         if compiler:
             TesterBlockchain._compiler = compiler
@@ -123,6 +128,26 @@ class TesterBlockchain(BlockchainDeployerInterface):
         if eth_airdrop is True:  # ETH for everyone!
             self.ether_airdrop(amount=DEVELOPMENT_ETH_AIRDROP_AMOUNT)
 
+    def _setup_solidity(self, compiler: SolidityCompiler = None):
+        """
+        Reuses compiled contract data from the compilation cache (any object with
+        pytest cache's get/set interface) while the solidity sources are unchanged.
+        """
+        if not (compiler and self.compilation_cache is not None):
+            return super()._setup_solidity(compiler=compiler)
+
+        source_digest = compiler.source_digest()
+        cached = self.compilation_cache.get(self._COMPILATION_CACHE_KEY, None)
+        if cached and cached['digest'] == source_digest:
+            self.log.info(f"Using cached compilation of solidity sources {source_digest}")
+            self._raw_contract_cache = cached['interfaces']
+            self._contract_factories = dict()
+            return
+
+        super()._setup_solidity(compiler=compiler)
+        self.compilation_cache.set(self._COMPILATION_CACHE_KEY, {'digest': source_digest,
+                                                                 'interfaces': self._raw_contract_cache})
+
     @staticmethod
     def free_gas_price_strategy(w3, transaction_params=None):
         return 0
@@ -171,6 +196,15 @@ class TesterBlockchain(BlockchainDeployerInterface):
 
         return tx_hashes
 
+    def get_blocktime(self) -> int:
+        """Timestamp of the latest block, read from eth-tester without a web3 round-trip"""
+        return self.provider.ethereum_tester.get_block_by_number('latest')['timestamp']
+
+    def get_balances(self, *addresses) -> List[int]:
+        """Ether balances of all the given addresses, read from eth-tester without web3 round-trips"""
+        ethereum_tester = self.provider.ethereum_tester
+        return [ethereum_tester.get_balance(address) for address in addresses]
+
     def time_travel(self, hours: int = None, seconds: int = None, periods: int = None):
         """
         Wait the specified number of wait_hours by comparing
@@ -193,7 +227,7 @@ class TesterBlockchain(BlockchainDeployerInterface):
         else:
             raise ValueError("Specify either hours, seconds, or periods.")
 
-        now = self.w3.eth.getBlock(block_identifier='latest').timestamp
+        now = self.get_blocktime()
         end_timestamp = ((now+duration)//base) * base
 
         self.w3.eth.web3.testing.timeTravel(timestamp=end_timestamp)
@@ -204,6 +238,59 @@ class TesterBlockchain(BlockchainDeployerInterface):
                       f"| period {epoch_to_period(epoch=end_timestamp, seconds_per_period=self._default_token_economics.seconds_per_period)} "
                       f"| epoch {end_timestamp}")
 
+    @contextmanager
+    def single_block(self):
+        """
+        Queues every transaction sent within the context
+        and mines them together in a single block on exit.
+
+        Queued transactions must come from distinct senders, since eth-tester assigns
+        the same nonce to every queued transaction of a sender and keeps only the last one,
+        and their gas allowances must fit together into the block gas limit.
+        """
+        ethereum_tester = self.provider.ethereum_tester
+        ethereum_tester.auto_mine_transactions = False
+        try:
+            yield
+        finally:
+            try:
+                ethereum_tester.mine_blocks(1)
+            finally:
+                # Never leave the shared tester chain without auto-mining, even if the block is invalid
+                ethereum_tester.auto_mine_transactions = True
+
+    def transact_batch(self, transactions: List[Tuple]) -> List[dict]:
+        """
+        Sends (contract function, payload) pairs within a single
+        mined block and returns their receipts in order.
+
+        Each transaction must have its own sender (see single_block). Unless the payload
+        sets an explicit gas allowance, the block gas limit is split evenly between them,
+        since tester gas estimates otherwise claim the whole block for every transaction.
+        """
+        senders = [payload['from'] for _contract_function, payload in transactions]
+        if len(set(senders)) != len(senders):
+            raise ValueError("Transactions mined within a single block must have distinct senders")
+
+        block_gas_limit = self.provider.ethereum_tester.get_block_by_number('pending')['gas_limit']
+        gas = block_gas_limit // len(transactions)
+        with self.single_block():
+            txhashes = [contract_function.transact({'gas': gas, **payload})
+                        for contract_function, payload in transactions]
+        return [self.wait_for_receipt(txhash) for txhash in txhashes]
+
+    def transact_nowait(self, contract_function, payload: dict) -> bytes:
+        """
+        Sends a transaction whose receipt is never inspected.
+        eth-tester mines it on send, so only its status is checked,
+        directly in the tester and without a web3 receipt lookup.
+        """
+        txhash = contract_function.transact(payload)
+        receipt = self.provider.ethereum_tester.get_transaction_receipt(Web3.toHex(txhash))
+        if receipt['status'] == 0:
+            raise TransactionFailed()
+        return txhash
+
     @classmethod
     def bootstrap_network(cls, economics: BaseEconomics = None) -> Tuple['TesterBlockchain', 'InMemoryContractRegistry']:
         """For use with metric testing scripts"""
@@ -267,7 +354,7 @@ class TesterBlockchain(BlockchainDeployerInterface):
     def wait_for_receipt(self, txhash: bytes, timeout: int = None) -> dict:
         """Wait for a transaction receipt and return it"""
         timeout = timeout or self.TIMEOUT
-        result = self.w3.eth.waitForTransactionReceipt(txhash, timeout=timeout)
+        result = self.client.wait_for_receipt(txhash, timeout=timeout)
         if result.status == 0:
             raise TransactionFailed()
         return result
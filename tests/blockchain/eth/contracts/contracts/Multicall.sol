@@ -0,0 +1,22 @@
+pragma solidity ^0.5.3;
+pragma experimental ABIEncoderV2;
+
+
+/**
+* @notice Contract for aggregating several read-only calls into a single call
+**/
+contract Multicall {
+
+    function aggregate(address[] memory _targets, bytes[] memory _data)
+        public view returns (bytes[] memory results)
+    {
+        require(_targets.length == _data.length);
+        results = new bytes[](_targets.length);
+        for (uint256 i = 0; i < _targets.length; i++) {
+            (bool success, bytes memory result) = _targets[i].staticcall(_data[i]);
+            require(success);
+            results[i] = result;
+        }
+    }
+
+}
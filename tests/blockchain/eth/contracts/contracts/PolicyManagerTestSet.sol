@@ -146,4 +146,16 @@ contract StakingEscrowForPolicyMock {
         }
     }
 
+    /**
+    * @notice Set default reward delta for several nodes in one transaction
+    * @param _nodes Nodes addresses
+    * @param _startPeriod Start period for setting values
+    * @param _numberOfPeriods Number of periods
+    */
+    function setDefaultRewardDeltas(address[] calldata _nodes, uint16 _startPeriod, uint16 _numberOfPeriods) external {
+        for (uint256 i = 0; i < _nodes.length; i++) {
+            setDefaultRewardDelta(_nodes[i], _startPeriod, _numberOfPeriods);
+        }
+    }
+
 }
@@ -16,14 +16,16 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import operator
 import os
+from collections import namedtuple
+from unittest.mock import Mock
 
 import pytest
 from eth_tester.exceptions import TransactionFailed
-from eth_utils import to_canonical_address, to_wei
+from eth_utils import keccak, to_canonical_address, to_wei
 from umbral.keys import UmbralPrivateKey
 from umbral.signing import Signer
-from web3.contract import Contract
 
 from nucypher.blockchain.economics import BaseEconomics
 from nucypher.blockchain.eth.interfaces import BlockchainInterface
@@ -36,13 +38,60 @@ WIND_DOWN_FIELD = 10
 DISABLED_FIELD = 5
 
 SECRET_LENGTH = 32
-escrow_secret = os.urandom(SECRET_LENGTH)
-policy_manager_secret = os.urandom(SECRET_LENGTH)
-router_secret = os.urandom(SECRET_LENGTH)
-adjudicator_secret = os.urandom(SECRET_LENGTH)
 
+WORKLOCK_SUPPLY = 1980
+DEPOSITED_ETH_1 = to_wei(18, 'ether')
+DEPOSITED_ETH_2 = to_wei(1, 'ether')
 
-@pytest.fixture()
+SlashState = namedtuple('SlashState', ['tokens',
+                                       'previous_lock',
+                                       'lock',
+                                       'next_lock',
+                                       'total_previous_lock',
+                                       'total_lock',
+                                       'next_total_lock',
+                                       'investigator_balance'])
+
+
+# Tests in this module share the chain state and must be run in order.
+# When running with pytest-xdist use '--dist loadfile' to keep them in one worker.
+pytestmark = pytest.mark.unchanged
+
+
+@pytest.fixture(scope='module')
+def deployment_secrets():
+    contracts = ('escrow', 'policy_manager', 'router', 'adjudicator')
+    pool = os.urandom(len(contracts) * SECRET_LENGTH)
+    return {contract: pool[index * SECRET_LENGTH:(index + 1) * SECRET_LENGTH]
+            for index, contract in enumerate(contracts)}
+
+
+@pytest.fixture(scope='module')
+def deployment_secret_hashes(deployment_secrets):
+    return {contract: keccak(secret) for contract, secret in deployment_secrets.items()}
+
+
+@pytest.fixture(scope='module')
+def upgrade_secrets():
+    """(secret, hash) pairs for the upgrade and the following rollback of each upgradeable contract"""
+    contracts = ('escrow', 'policy_manager', 'router', 'adjudicator')
+    pool = os.urandom(2 * len(contracts) * SECRET_LENGTH)
+    secrets = [pool[index * SECRET_LENGTH:(index + 1) * SECRET_LENGTH] for index in range(2 * len(contracts))]
+    pairs = [(secret, keccak(secret)) for secret in secrets]
+    return {contract: (pairs[2 * index], pairs[2 * index + 1]) for index, contract in enumerate(contracts)}
+
+
+@pytest.fixture(scope='module')
+def accounts(testerchain):
+    return tuple(testerchain.client.accounts)
+
+
+@pytest.fixture(scope='module')
+def contracts_owners(accounts):
+    return tuple(sorted(accounts[7:]))
+
+
+@pytest.fixture(scope='module')
 def token_economics():
     economics = BaseEconomics(
         initial_supply=10 ** 9,
@@ -60,60 +109,53 @@ def token_economics():
     return economics
 
 
-@pytest.fixture()
+@pytest.fixture(scope='module')
 def token(token_economics, deploy_contract):
     # Create an ERC20 token
     contract, _ = deploy_contract('NuCypherToken', _totalSupply=token_economics.erc20_total_supply)
     return contract
 
 
-@pytest.fixture()
-def escrow(testerchain, token, token_economics, deploy_contract):
+@pytest.fixture(scope='module')
+def escrow(testerchain, token, token_economics, deployment_secret_hashes, deploy_contract):
     # Creator deploys the escrow
     contract, _ = deploy_contract(
         'StakingEscrow', token.address, *token_economics.staking_deployment_parameters, True
     )
 
-    secret_hash = testerchain.w3.keccak(escrow_secret)
+    secret_hash = deployment_secret_hashes['escrow']
     dispatcher, _ = deploy_contract('Dispatcher', contract.address, secret_hash)
 
-    # Wrap dispatcher contract
-    contract = testerchain.client.get_contract(
-        abi=contract.abi,
-        address=dispatcher.address,
-        ContractFactoryClass=Contract)
+    # Wrap dispatcher contract, reusing the factory class generated for the target
+    contract = type(contract)(address=dispatcher.address)
     return contract, dispatcher
 
 
-@pytest.fixture()
-def policy_manager(testerchain, escrow, deploy_contract):
+@pytest.fixture(scope='module')
+def policy_manager(testerchain, accounts, escrow, deployment_secret_hashes, deploy_contract):
     escrow, _ = escrow
-    creator = testerchain.client.accounts[0]
+    creator = accounts[0]
 
-    secret_hash = testerchain.w3.keccak(policy_manager_secret)
+    secret_hash = deployment_secret_hashes['policy_manager']
 
     # Creator deploys the policy manager
     contract, _ = deploy_contract('PolicyManager', escrow.address)
     dispatcher, _ = deploy_contract('Dispatcher', contract.address, secret_hash)
 
-    # Wrap dispatcher contract
-    contract = testerchain.client.get_contract(
-        abi=contract.abi,
-        address=dispatcher.address,
-        ContractFactoryClass=Contract)
+    # Wrap dispatcher contract, reusing the factory class generated for the target
+    contract = type(contract)(address=dispatcher.address)
 
-    tx = escrow.functions.setPolicyManager(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.setPolicyManager(contract.address), {'from': creator})
 
     return contract, dispatcher
 
 
-@pytest.fixture()
-def adjudicator(testerchain, escrow, token_economics, deploy_contract):
+@pytest.fixture(scope='module')
+def adjudicator(testerchain, accounts, escrow, token_economics, deployment_secret_hashes, deploy_contract):
     escrow, _ = escrow
-    creator = testerchain.client.accounts[0]
+    creator = accounts[0]
 
-    secret_hash = testerchain.w3.keccak(adjudicator_secret)
+    secret_hash = deployment_secret_hashes['adjudicator']
 
     # Creator deploys the contract
     contract, _ = deploy_contract(
@@ -123,19 +165,15 @@ def adjudicator(testerchain, escrow, token_economics, deploy_contract):
 
     dispatcher, _ = deploy_contract('Dispatcher', contract.address, secret_hash)
 
-    # Wrap dispatcher contract
-    contract = testerchain.client.get_contract(
-        abi=contract.abi,
-        address=dispatcher.address,
-        ContractFactoryClass=Contract)
+    # Wrap dispatcher contract, reusing the factory class generated for the target
+    contract = type(contract)(address=dispatcher.address)
 
-    tx = escrow.functions.setAdjudicator(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.setAdjudicator(contract.address), {'from': creator})
 
     return contract, dispatcher
 
 
-def mock_ursula(testerchain, account, mocker):
+def mock_ursula(testerchain, account):
     ursula_privkey = UmbralPrivateKey.gen_key()
     ursula_stamp = SignatureStamp(verifying_key=ursula_privkey.pubkey,
                                   signer=Signer(ursula_privkey))
@@ -143,7 +181,7 @@ def mock_ursula(testerchain, account, mocker):
     signed_stamp = testerchain.client.sign_message(account=account,
                                                    message=bytes(ursula_stamp))
 
-    ursula = mocker.Mock(stamp=ursula_stamp, decentralized_identity_evidence=signed_stamp)
+    ursula = Mock(stamp=ursula_stamp, decentralized_identity_evidence=signed_stamp)
     return ursula
 
 
@@ -155,11 +193,26 @@ def generate_args_for_slashing(mock_ursula_reencrypts, ursula):
     return data_hash, args
 
 
-@pytest.fixture()
-def staking_interface(testerchain, token, escrow, policy_manager, deploy_contract):
+@pytest.fixture(scope='module')
+def slashing_evidence(testerchain, accounts, mock_ursula_reencrypts):
+    """
+    Pool of precomputed corrupted re-encryptions for each slashed staker,
+    so that the elliptic curve work happens once during setup.
+    Stamps are signed by the tester accounts, so the pool can't outlive the module's chain.
+    """
+    _creator, staker1, staker2, staker3 = accounts[:4]
+    pool = dict()
+    for staker, slashes in ((staker1, 3), (staker2, 1), (staker3, 1)):
+        ursula = mock_ursula(testerchain, staker)
+        pool[staker] = [generate_args_for_slashing(mock_ursula_reencrypts, ursula) for _ in range(slashes)]
+    return pool
+
+
+@pytest.fixture(scope='module')
+def staking_interface(testerchain, token, escrow, policy_manager, deployment_secret_hashes, deploy_contract):
     escrow, _ = escrow
     policy_manager, _ = policy_manager
-    secret_hash = testerchain.w3.keccak(router_secret)
+    secret_hash = deployment_secret_hashes['router']
     # Creator deploys the staking interface
     staking_interface, _ = deploy_contract(
         'StakingInterface', token.address, escrow.address, policy_manager.address)
@@ -168,13 +221,13 @@ def staking_interface(testerchain, token, escrow, policy_manager, deploy_contrac
     return staking_interface, router
 
 
-@pytest.fixture()
-def worklock(testerchain, token, escrow, token_economics, deploy_contract):
+@pytest.fixture(scope='module')
+def worklock(testerchain, accounts, token, escrow, token_economics, deploy_contract):
     escrow, _ = escrow
-    creator = testerchain.w3.eth.accounts[0]
+    creator = accounts[0]
 
     # Creator deploys the worklock using test values
-    now = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
+    now = testerchain.get_blocktime()
     start_bid_date = ((now + 3600) // 3600 + 1) * 3600  # beginning of the next hour plus 1 hour
     end_bid_date = start_bid_date + 3600
     boosting_refund = 100
@@ -189,53 +242,132 @@ def worklock(testerchain, token, escrow, token_economics, deploy_contract):
         _stakingPeriods=staking_periods
     )
 
-    tx = escrow.functions.setWorkLock(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.setWorkLock(contract.address), {'from': creator})
 
     return contract
 
 
-@pytest.fixture()
-def multisig(testerchain, escrow, policy_manager, adjudicator, staking_interface, deploy_contract):
+@pytest.fixture(scope='module')
+def multisig(testerchain,
+             accounts,
+             contracts_owners,
+             escrow,
+             policy_manager,
+             adjudicator,
+             staking_interface,
+             deploy_contract):
     escrow, escrow_dispatcher = escrow
     policy_manager, policy_manager_dispatcher = policy_manager
     adjudicator, adjudicator_dispatcher = adjudicator
     staking_interface, staking_interface_router = staking_interface
-    creator, _staker1, _staker2, _staker3, _staker4, _alice1, _alice2, *contract_owners =\
-        testerchain.client.accounts
-    contract_owners = sorted(contract_owners)
-    contract, _ = deploy_contract('MultiSig', 2, contract_owners)
-    tx = escrow.functions.transferOwnership(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = policy_manager.functions.transferOwnership(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = adjudicator.functions.transferOwnership(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = staking_interface_router.functions.transferOwnership(contract.address).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    creator = accounts[0]
+    contract, _ = deploy_contract('MultiSig', 2, list(contracts_owners))
+    testerchain.transact_nowait(escrow.functions.transferOwnership(contract.address), {'from': creator})
+    testerchain.transact_nowait(policy_manager.functions.transferOwnership(contract.address), {'from': creator})
+    testerchain.transact_nowait(adjudicator.functions.transferOwnership(contract.address), {'from': creator})
+    testerchain.transact_nowait(staking_interface_router.functions.transferOwnership(contract.address),
+                                {'from': creator})
     return contract
 
 
-def execute_multisig_transaction(testerchain, multisig, accounts, tx):
+@pytest.fixture(scope='module')
+def preallocation_escrows(token, escrow, staking_interface, deploy_contract):
+    escrow, _ = escrow
+    _staking_interface, router = staking_interface
+
+    # Both deployments come from the creator, so they can't share a block in eth-tester
+    return [deploy_contract('PreallocationEscrow', router.address, token.address, escrow.address)[0]
+            for _ in range(2)]
+
+
+@pytest.fixture(scope='module')
+def preallocation_escrow_1(staking_interface, preallocation_escrows):
+    staking_interface, _router = staking_interface
+    contract = preallocation_escrows[0]
 
-    def to_32byte_hex(w3, value):
-        return w3.toHex(w3.toBytes(value).rjust(32, b'\0'))
+    # Wrap preallocation escrow contract with the staking interface
+    interface = type(staking_interface)(address=contract.address)
+    return contract, interface
 
-    def sign_hash(testerchain, account: str, data_hash: bytes) -> dict:
-        provider = testerchain.provider
-        address = to_canonical_address(account)
-        key = provider.ethereum_tester.backend._key_lookup[address]._raw_key
-        signed_data = testerchain.w3.eth.account.signHash(data_hash, key)
-        return signed_data
+
+@pytest.fixture(scope='module')
+def preallocation_escrow_2(preallocation_escrows):
+    return preallocation_escrows[1]
+
+
+def snapshot_balances(testerchain, *addresses) -> dict:
+    """Reads the current ether balances of all the given addresses at once"""
+    return dict(zip(addresses, testerchain.get_balances(*addresses)))
+
+
+def confirm_activity(testerchain, escrow, *stakers):
+    """
+    Confirms activity for all the given stakers within a single mined block.
+    StakingEscrow only accepts confirmations sent directly by workers (msg.sender == tx.origin),
+    so these can't be fused into one call through a helper contract.
+    """
+    confirm_activity_function = escrow.functions.confirmActivity()
+    testerchain.transact_batch([(confirm_activity_function, {'from': staker}) for staker in stakers])
+
+
+def confirm_activity_for_periods(testerchain, escrow, periods, *stakers):
+    """
+    Confirms activity for all the given stakers in each of the next periods, advancing one period at a time.
+    StakingEscrow unlocks and mints only for confirmed periods, so a single long time travel can't replace this.
+    """
+    for _period in range(periods):
+        confirm_activity(testerchain, escrow, *stakers)
+        testerchain.time_travel(hours=1)
+
+
+def read_slash_state(batch_call, escrow, token, staker, investigator, current_period) -> SlashState:
+    """Reads staker's token amounts, the overall locked amounts and investigator's balance in one aggregated call"""
+    return SlashState(*batch_call(escrow.functions.getAllTokens(staker),
+                                  escrow.functions.getLockedTokensInPast(staker, 1),
+                                  escrow.functions.getLockedTokens(staker, 0),
+                                  escrow.functions.getLockedTokens(staker, 1),
+                                  escrow.functions.lockedPerPeriod(current_period - 1),
+                                  escrow.functions.lockedPerPeriod(current_period),
+                                  escrow.functions.lockedPerPeriod(current_period + 1),
+                                  token.functions.balanceOf(investigator)))
+
+
+def assert_slashed(pre: SlashState, post: SlashState, **changes):
+    """Checks that slashing changed exactly the given fields of the state and nothing else"""
+    assert post == pre._replace(**changes)
+
+
+def evaluate_cfrag(testerchain, adjudicator, investigator, evidence):
+    """Submits the evidence to the adjudicator and checks that it gets evaluated exactly once"""
+    data_hash, slashing_args = evidence
+    assert not adjudicator.functions.evaluatedCFrags(data_hash).call()
+    testerchain.transact_nowait(adjudicator.functions.evaluateCFrag(*slashing_args), {'from': investigator})
+    assert adjudicator.functions.evaluatedCFrags(data_hash).call()
+
+
+def assert_rejected(contract_functions, senders):
+    """
+    Checks that none of the senders is allowed to execute any of the contract functions.
+    The checks are simulated with eth_call, so nothing gets mined.
+    """
+    for contract_function in contract_functions:
+        for sender in senders:
+            with pytest.raises((TransactionFailed, ValueError)):
+                contract_function.call({'from': sender})
+
+
+def execute_multisig_transaction(testerchain, multisig, accounts, tx):
+    w3 = testerchain.w3
+    key_lookup = testerchain.provider.ethereum_tester.backend._key_lookup
 
     nonce = multisig.functions.nonce().call()
     tx_hash = multisig.functions.getUnsignedTransactionHash(accounts[0], tx['to'], 0, tx['data'], nonce).call()
-    signatures = [sign_hash(testerchain, account, tx_hash) for account in accounts]
-    w3 = testerchain.w3
+    signatures = [w3.eth.account.signHash(tx_hash, key_lookup[to_canonical_address(account)]._raw_key)
+                  for account in accounts]
     tx = multisig.functions.execute(
         [signature.v for signature in signatures],
-        [to_32byte_hex(w3, signature.r) for signature in signatures],
-        [to_32byte_hex(w3, signature.s) for signature in signatures],
+        [signature.r.to_bytes(32, byteorder='big') for signature in signatures],
+        [signature.s.to_bytes(32, byteorder='big') for signature in signatures],
         tx['to'],
         0,
         tx['data']
@@ -244,62 +376,39 @@ def execute_multisig_transaction(testerchain, multisig, accounts, tx):
 
 
 @pytest.mark.slow
-def test_all(testerchain,
-             token_economics,
-             token,
-             escrow,
-             policy_manager,
-             adjudicator,
-             worklock,
-             staking_interface,
-             multisig,
-             mock_ursula_reencrypts,
-             deploy_contract,
-             mocker):
+def test_worklock(testerchain,
+                  accounts,
+                  contracts_owners,
+                  token_economics,
+                  token,
+                  escrow,
+                  worklock,
+                  multisig,
+                  batch_call):
 
     # Travel to the start of the next period to prevent problems with unexpected overflow first period
     testerchain.time_travel(hours=1)
 
-    escrow, escrow_dispatcher = escrow
-    policy_manager, policy_manager_dispatcher = policy_manager
-    adjudicator, adjudicator_dispatcher = adjudicator
-    staking_interface, staking_interface_router = staking_interface
-    creator, staker1, staker2, staker3, staker4, alice1, alice2, *contracts_owners =\
-        testerchain.client.accounts
-    contracts_owners = sorted(contracts_owners)
-
-    # We'll need this later for slashing these Ursulas
-    ursula1_with_stamp = mock_ursula(testerchain, staker1, mocker=mocker)
-    ursula2_with_stamp = mock_ursula(testerchain, staker2, mocker=mocker)
-    ursula3_with_stamp = mock_ursula(testerchain, staker3, mocker=mocker)
+    escrow, _escrow_dispatcher = escrow
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
 
     # Give clients some ether
-    tx = testerchain.client.send_transaction(
-        {'from': testerchain.client.coinbase, 'to': alice1, 'value': 10 ** 10})
-    testerchain.wait_for_receipt(tx)
-    tx = testerchain.client.send_transaction(
-        {'from': testerchain.client.coinbase, 'to': alice2, 'value': 10 ** 10})
-    testerchain.wait_for_receipt(tx)
-    tx = testerchain.w3.eth.sendTransaction(
-        {'from': testerchain.w3.eth.coinbase, 'to': staker2, 'value': 10 ** 10})
-    testerchain.wait_for_receipt(tx)
+    # The funding and the coin transfers below each come from one sender, so they can't share a block in eth-tester
+    coinbase = testerchain.client.coinbase
+    for client in (alice1, alice2, staker2):
+        tx = testerchain.client.send_transaction({'from': coinbase, 'to': client, 'value': 10 ** 10})
+        testerchain.wait_for_receipt(tx)
 
     # Give staker and Alice some coins
-    tx = token.functions.transfer(staker1, 10000).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = token.functions.transfer(alice1, 10000).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = token.functions.transfer(alice2, 10000).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    assert 10000 == token.functions.balanceOf(staker1).call()
-    assert 10000 == token.functions.balanceOf(alice1).call()
-    assert 10000 == token.functions.balanceOf(alice2).call()
+    for client in (staker1, alice1, alice2):
+        testerchain.transact_nowait(token.functions.transfer(client, 10000), {'from': creator})
+    assert [10000, 10000, 10000] == batch_call(token.functions.balanceOf(staker1),
+                                               token.functions.balanceOf(alice1),
+                                               token.functions.balanceOf(alice2))
 
     # Staker gives Escrow rights to transfer
-    tx = token.functions.approve(escrow.address, 10000).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = token.functions.approve(escrow.address, 10000).transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_batch([(token.functions.approve(escrow.address, 10000), {'from': staker})
+                                for staker in (staker1, staker2)])
 
     # Staker can't deposit tokens before Escrow initialization
     with pytest.raises((TransactionFailed, ValueError)):
@@ -307,8 +416,8 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # Initialize escrow
-    tx = token.functions.transfer(multisig.address, token_economics.erc20_reward_supply).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(token.functions.transfer(multisig.address, token_economics.erc20_reward_supply),
+                                {'from': creator})
     tx = token.functions.approve(escrow.address, token_economics.erc20_reward_supply)\
         .buildTransaction({'from': multisig.address, 'gasPrice': 0})
     execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], contracts_owners[1]], tx)
@@ -317,15 +426,13 @@ def test_all(testerchain,
     execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], contracts_owners[1]], tx)
 
     # Initialize worklock
-    worklock_supply = 1980
-    tx = token.functions.approve(worklock.address, worklock_supply).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = worklock.functions.tokenDeposit(worklock_supply).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    worklock_supply = WORKLOCK_SUPPLY
+    testerchain.transact_nowait(token.functions.approve(worklock.address, worklock_supply), {'from': creator})
+    testerchain.transact_nowait(worklock.functions.tokenDeposit(worklock_supply), {'from': creator})
 
     # Can't do anything before start date
-    deposited_eth_1 = to_wei(18, 'ether')
-    deposited_eth_2 = to_wei(1, 'ether')
+    deposited_eth_1 = DEPOSITED_ETH_1
+    deposited_eth_2 = DEPOSITED_ETH_2
     with pytest.raises((TransactionFailed, ValueError)):
         tx = worklock.functions.bid().transact({'from': staker2, 'value': deposited_eth_1, 'gas_price': 0})
         testerchain.wait_for_receipt(tx)
@@ -336,8 +443,7 @@ def test_all(testerchain,
     # Staker does bid
     assert worklock.functions.workInfo(staker2).call()[0] == 0
     assert testerchain.w3.eth.getBalance(worklock.address) == 0
-    tx = worklock.functions.bid().transact({'from': staker2, 'value': deposited_eth_1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.bid(), {'from': staker2, 'value': deposited_eth_1, 'gas_price': 0})
     assert worklock.functions.workInfo(staker2).call()[0] == deposited_eth_1
     assert testerchain.w3.eth.getBalance(worklock.address) == deposited_eth_1
     assert worklock.functions.ethToTokens(deposited_eth_1).call() == worklock_supply
@@ -349,15 +455,13 @@ def test_all(testerchain,
 
     # Other stakers do bid
     assert worklock.functions.workInfo(staker1).call()[0] == 0
-    tx = worklock.functions.bid().transact({'from': staker1, 'value': deposited_eth_2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.bid(), {'from': staker1, 'value': deposited_eth_2, 'gas_price': 0})
     assert worklock.functions.workInfo(staker1).call()[0] == deposited_eth_2
     assert testerchain.w3.eth.getBalance(worklock.address) == deposited_eth_1 + deposited_eth_2
     assert worklock.functions.ethToTokens(deposited_eth_2).call() == worklock_supply // 19
 
     assert worklock.functions.workInfo(staker4).call()[0] == 0
-    tx = worklock.functions.bid().transact({'from': staker4, 'value': deposited_eth_2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.bid(), {'from': staker4, 'value': deposited_eth_2, 'gas_price': 0})
     assert worklock.functions.workInfo(staker4).call()[0] == deposited_eth_2
     assert testerchain.w3.eth.getBalance(worklock.address) == deposited_eth_1 + 2 * deposited_eth_2
     assert worklock.functions.ethToTokens(deposited_eth_2).call() == worklock_supply // 20
@@ -371,8 +475,7 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # One of stakers cancels bid
-    tx = worklock.functions.cancelBid().transact({'from': staker1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.cancelBid(), {'from': staker1, 'gas_price': 0})
     assert worklock.functions.workInfo(staker1).call()[0] == 0
     assert testerchain.w3.eth.getBalance(worklock.address) == deposited_eth_1 + deposited_eth_2
     assert worklock.functions.ethToTokens(deposited_eth_2).call() == worklock_supply // 20
@@ -380,48 +483,57 @@ def test_all(testerchain,
 
     # Staker claims tokens
     assert not worklock.functions.workInfo(staker2).call()[2]
-    tx = worklock.functions.claim().transact({'from': staker2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.claim(), {'from': staker2, 'gas_price': 0})
     assert worklock.functions.workInfo(staker2).call()[2]
 
     staker2_tokens = worklock_supply * 9 // 10
-    assert token.functions.balanceOf(staker2).call() == 0
-    assert escrow.functions.getLockedTokens(staker2, 0).call() == 0
-    assert escrow.functions.getLockedTokens(staker2, 1).call() == staker2_tokens
-    assert escrow.functions.getLockedTokens(staker2, token_economics.minimum_locked_periods).call() == staker2_tokens
-    assert escrow.functions.getLockedTokens(staker2, token_economics.minimum_locked_periods + 1).call() == 0
     staker2_remaining_work = staker2_tokens
-    assert worklock.functions.ethToWork(deposited_eth_1).call() == staker2_remaining_work
-    assert worklock.functions.workToETH(staker2_remaining_work).call() == deposited_eth_1
-    assert worklock.functions.getRemainingWork(staker2).call() == staker2_remaining_work
-    assert token.functions.balanceOf(worklock.address).call() == worklock_supply - staker2_tokens
-    tx = escrow.functions.setWorker(staker2).transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
+    assert batch_call(
+        token.functions.balanceOf(staker2),
+        escrow.functions.getLockedTokens(staker2, 0),
+        escrow.functions.getLockedTokens(staker2, 1),
+        escrow.functions.getLockedTokens(staker2, token_economics.minimum_locked_periods),
+        escrow.functions.getLockedTokens(staker2, token_economics.minimum_locked_periods + 1),
+        worklock.functions.ethToWork(deposited_eth_1),
+        worklock.functions.workToETH(staker2_remaining_work),
+        worklock.functions.getRemainingWork(staker2),
+        token.functions.balanceOf(worklock.address)
+    ) == [0,
+          0,
+          staker2_tokens,
+          staker2_tokens,
+          0,
+          staker2_remaining_work,
+          deposited_eth_1,
+          staker2_remaining_work,
+          worklock_supply - staker2_tokens]
+    testerchain.transact_nowait(escrow.functions.setWorker(staker2), {'from': staker2})
     escrow_balance = token_economics.erc20_reward_supply + staker2_tokens
     assert escrow.functions.getAllTokens(staker2).call() == staker2_tokens
     assert escrow.functions.getCompletedWork(staker2).call() == 0
-    tx = escrow.functions.setWindDown(True).transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.setWindDown(True), {'from': staker2})
     assert escrow.functions.stakerInfo(staker2).call()[WIND_DOWN_FIELD]
 
     # Burn remaining tokens in WorkLock
-    tx = worklock.functions.burnUnclaimed().transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.burnUnclaimed(), {'from': creator})
     unclaimed = worklock_supply // 20
     escrow_balance += unclaimed
-    assert worklock.functions.unclaimedTokens().call() == 0
-    assert token.functions.balanceOf(worklock.address).call() == worklock_supply - staker2_tokens - unclaimed
-    assert escrow_balance == token.functions.balanceOf(escrow.address).call()
-    assert token_economics.erc20_reward_supply + unclaimed == escrow.functions.getReservedReward().call()
+    assert batch_call(worklock.functions.unclaimedTokens(),
+                      token.functions.balanceOf(worklock.address),
+                      token.functions.balanceOf(escrow.address),
+                      escrow.functions.getReservedReward()
+                      ) == [0,
+                            worklock_supply - staker2_tokens - unclaimed,
+                            escrow_balance,
+                            token_economics.erc20_reward_supply + unclaimed]
 
     # Staker prolongs lock duration
-    tx = escrow.functions.prolongStake(0, 3).transact({'from': staker2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert escrow.functions.getLockedTokens(staker2, 0).call() == 0
-    assert escrow.functions.getLockedTokens(staker2, 1).call() == staker2_tokens
-    assert escrow.functions.getLockedTokens(staker2, 9).call() == staker2_tokens
-    assert escrow.functions.getLockedTokens(staker2, 10).call() == 0
-    assert escrow.functions.getCompletedWork(staker2).call() == 0
+    testerchain.transact_nowait(escrow.functions.prolongStake(0, 3), {'from': staker2, 'gas_price': 0})
+    assert batch_call(escrow.functions.getLockedTokens(staker2, 0),
+                      escrow.functions.getLockedTokens(staker2, 1),
+                      escrow.functions.getLockedTokens(staker2, 9),
+                      escrow.functions.getLockedTokens(staker2, 10),
+                      escrow.functions.getCompletedWork(staker2)) == [0, staker2_tokens, staker2_tokens, 0, 0]
 
     # Can't claim more than once
     with pytest.raises((TransactionFailed, ValueError)):
@@ -432,21 +544,28 @@ def test_all(testerchain,
         tx = worklock.functions.refund().transact({'from': staker2, 'gas_price': 0})
         testerchain.wait_for_receipt(tx)
 
-    # Create the first preallocation escrow
-    preallocation_escrow_1, _ = deploy_contract(
-        'PreallocationEscrow', staking_interface_router.address, token.address, escrow.address)
-    preallocation_escrow_interface_1 = testerchain.client.get_contract(
-        abi=staking_interface.abi,
-        address=preallocation_escrow_1.address,
-        ContractFactoryClass=Contract)
+
+@pytest.mark.slow
+def test_staking(testerchain,
+                 accounts,
+                 contracts_owners,
+                 token,
+                 escrow,
+                 preallocation_escrow_1,
+                 preallocation_escrow_2,
+                 batch_call):
+    escrow, _escrow_dispatcher = escrow
+    preallocation_escrow_1, preallocation_escrow_interface_1 = preallocation_escrow_1
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
+
+    escrow_balance = token.functions.balanceOf(escrow.address).call()
 
     # Set and lock re-stake parameter in first preallocation escrow
-    tx = preallocation_escrow_1.functions.transferOwnership(staker3).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(preallocation_escrow_1.functions.transferOwnership(staker3), {'from': creator})
     assert not escrow.functions.stakerInfo(preallocation_escrow_1.address).call()[DISABLE_RE_STAKE_FIELD]
     current_period = escrow.functions.getCurrentPeriod().call()
-    tx = preallocation_escrow_interface_1.functions.lockReStake(current_period + 22).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.lockReStake(current_period + 22),
+                                {'from': staker3})
     assert not escrow.functions.stakerInfo(preallocation_escrow_1.address).call()[DISABLE_RE_STAKE_FIELD]
     # Can't unlock re-stake parameter now
     with pytest.raises((TransactionFailed, ValueError)):
@@ -454,31 +573,29 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # Deposit some tokens to the preallocation escrow and lock them
-    tx = token.functions.approve(preallocation_escrow_1.address, 10000).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = preallocation_escrow_1.functions.initialDeposit(10000, 20 * 60 * 60).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(token.functions.approve(preallocation_escrow_1.address, 10000), {'from': creator})
+    testerchain.transact_nowait(preallocation_escrow_1.functions.initialDeposit(10000, 20 * 60 * 60), {'from': creator})
 
-    assert 10000 == token.functions.balanceOf(preallocation_escrow_1.address).call()
-    assert staker3 == preallocation_escrow_1.functions.owner().call()
-    assert 10000 >= preallocation_escrow_1.functions.getLockedTokens().call()
-    assert 9500 <= preallocation_escrow_1.functions.getLockedTokens().call()
+    balance, owner, locked_tokens = batch_call(token.functions.balanceOf(preallocation_escrow_1.address),
+                                               preallocation_escrow_1.functions.owner(),
+                                               preallocation_escrow_1.functions.getLockedTokens())
+    assert 10000 == balance
+    assert staker3 == owner
+    assert 9500 <= locked_tokens <= 10000
 
     # Deploy one more preallocation escrow
     staker4_tokens = 10000
-    preallocation_escrow_2, _ = deploy_contract(
-        'PreallocationEscrow', staking_interface_router.address, token.address, escrow.address)
-    tx = preallocation_escrow_2.functions.transferOwnership(staker4).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = token.functions.approve(preallocation_escrow_2.address, staker4_tokens).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-    tx = preallocation_escrow_2.functions.initialDeposit(staker4_tokens, 20 * 60 * 60).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
-
-    assert token.functions.balanceOf(staker4).call() == 0
-    assert token.functions.balanceOf(preallocation_escrow_2.address).call() == staker4_tokens
-    assert preallocation_escrow_2.functions.owner().call() == staker4
-    assert preallocation_escrow_2.functions.getLockedTokens().call() == staker4_tokens
+    testerchain.transact_nowait(preallocation_escrow_2.functions.transferOwnership(staker4), {'from': creator})
+    testerchain.transact_nowait(token.functions.approve(preallocation_escrow_2.address, staker4_tokens),
+                                {'from': creator})
+    testerchain.transact_nowait(preallocation_escrow_2.functions.initialDeposit(staker4_tokens, 20 * 60 * 60),
+                                {'from': creator})
+
+    assert batch_call(token.functions.balanceOf(staker4),
+                      token.functions.balanceOf(preallocation_escrow_2.address),
+                      preallocation_escrow_2.functions.owner(),
+                      preallocation_escrow_2.functions.getLockedTokens()
+                      ) == [0, staker4_tokens, staker4, staker4_tokens]
 
     # Staker's withdrawal attempt won't succeed because nothing to withdraw
     with pytest.raises((TransactionFailed, ValueError)):
@@ -491,13 +608,9 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # Check that nothing is locked
-    assert 0 == escrow.functions.getLockedTokens(staker1, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(staker2, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(staker3, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(staker4, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(preallocation_escrow_2.address, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(contracts_owners[0], 0).call()
+    stakers = (staker1, staker2, staker3, staker4,
+               preallocation_escrow_1.address, preallocation_escrow_2.address, contracts_owners[0])
+    assert not any(batch_call(*(escrow.functions.getLockedTokens(staker, 0) for staker in stakers)))
 
     # Staker can't deposit and lock too low value
     with pytest.raises((TransactionFailed, ValueError)):
@@ -510,48 +623,39 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # Grant access to transfer tokens
-    tx = token.functions.approve(escrow.address, 10000).transact({'from': creator})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(token.functions.approve(escrow.address, 10000), {'from': creator})
 
     # Staker transfers some tokens to the escrow and lock them
-    tx = escrow.functions.deposit(1000, 10).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.setWorker(staker1).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.setReStake(False).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.setWindDown(True).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.deposit(1000, 10), {'from': staker1})
+    testerchain.transact_nowait(escrow.functions.setWorker(staker1), {'from': staker1})
+    testerchain.transact_nowait(escrow.functions.setReStake(False), {'from': staker1})
+    testerchain.transact_nowait(escrow.functions.setWindDown(True), {'from': staker1})
     assert escrow.functions.stakerInfo(staker1).call()[WIND_DOWN_FIELD]
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.confirmActivity(), {'from': staker1})
     escrow_balance += 1000
-    assert escrow_balance == token.functions.balanceOf(escrow.address).call()
-    assert 9000 == token.functions.balanceOf(staker1).call()
-    assert 0 == escrow.functions.getLockedTokens(staker1, 0).call()
-    assert 1000 == escrow.functions.getLockedTokens(staker1, 1).call()
-    assert 1000 == escrow.functions.getLockedTokens(staker1, 10).call()
-    assert 0 == escrow.functions.getLockedTokens(staker1, 11).call()
+    assert [escrow_balance, 9000, 0, 1000, 1000, 0] == batch_call(token.functions.balanceOf(escrow.address),
+                                                                token.functions.balanceOf(staker1),
+                                                                escrow.functions.getLockedTokens(staker1, 0),
+                                                                escrow.functions.getLockedTokens(staker1, 1),
+                                                                escrow.functions.getLockedTokens(staker1, 10),
+                                                                escrow.functions.getLockedTokens(staker1, 11))
 
     # Wait 1 period and deposit from one more staker
     testerchain.time_travel(hours=1)
-    tx = preallocation_escrow_interface_1.functions.depositAsStaker(1000, 10).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
-    tx = preallocation_escrow_interface_1.functions.setWorker(staker3).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
-    tx = preallocation_escrow_interface_1.functions.setWindDown(True).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.depositAsStaker(1000, 10), {'from': staker3})
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.setWorker(staker3), {'from': staker3})
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.setWindDown(True), {'from': staker3})
     assert escrow.functions.stakerInfo(preallocation_escrow_interface_1.address).call()[WIND_DOWN_FIELD]
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.confirmActivity(), {'from': staker3})
     escrow_balance += 1000
-    assert 1000 == escrow.functions.getAllTokens(preallocation_escrow_1.address).call()
-    assert 0 == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 0).call()
-    assert 1000 == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 1).call()
-    assert 1000 == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 10).call()
-    assert 0 == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 11).call()
-    assert escrow_balance == token.functions.balanceOf(escrow.address).call()
-    assert 9000 == token.functions.balanceOf(preallocation_escrow_1.address).call()
+    assert [1000, 0, 1000, 1000, 0, escrow_balance, 9000] == batch_call(
+        escrow.functions.getAllTokens(preallocation_escrow_1.address),
+        escrow.functions.getLockedTokens(preallocation_escrow_1.address, 0),
+        escrow.functions.getLockedTokens(preallocation_escrow_1.address, 1),
+        escrow.functions.getLockedTokens(preallocation_escrow_1.address, 10),
+        escrow.functions.getLockedTokens(preallocation_escrow_1.address, 11),
+        token.functions.balanceOf(escrow.address),
+        token.functions.balanceOf(preallocation_escrow_1.address))
 
     # Only owner can deposit tokens to the staking escrow
     with pytest.raises((TransactionFailed, ValueError)):
@@ -563,87 +667,65 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # Divide stakes
-    tx = escrow.functions.divideStake(0, 500, 6).transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.divideStake(0, 500, 9).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = preallocation_escrow_interface_1.functions.divideStake(0, 500, 6).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.divideStake(0, 500, 6), {'from': staker2})
+    testerchain.transact_nowait(escrow.functions.divideStake(0, 500, 9), {'from': staker1})
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.divideStake(0, 500, 6), {'from': staker3})
 
     # Confirm activity
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.confirmActivity(), {'from': staker1})
 
     testerchain.time_travel(hours=1)
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    confirm_activity(testerchain, escrow, staker1, staker2, staker3)
 
     # Turn on re-stake for staker1
     assert escrow.functions.stakerInfo(staker1).call()[DISABLE_RE_STAKE_FIELD]
-    tx = escrow.functions.setReStake(True).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.setReStake(True), {'from': staker1})
     assert not escrow.functions.stakerInfo(staker1).call()[DISABLE_RE_STAKE_FIELD]
 
     testerchain.time_travel(hours=1)
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    confirm_activity(testerchain, escrow, staker1, staker2, staker3)
+
+
+@pytest.mark.slow
+def test_policy(testerchain, accounts, escrow, policy_manager, preallocation_escrow_1):
+    escrow, _escrow_dispatcher = escrow
+    policy_manager, _policy_manager_dispatcher = policy_manager
+    preallocation_escrow_1, preallocation_escrow_interface_1 = preallocation_escrow_1
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
 
     # Create policies
-    policy_id_1 = os.urandom(16)
+    pool = os.urandom(5 * 16)
+    policy_id_1, policy_id_2, policy_id_3, policy_id_4, policy_id_5 = (pool[i:i + 16] for i in range(0, len(pool), 16))
     number_of_periods = 5
     one_period = 60 * 60
     rate = 200
     one_node_value = number_of_periods * rate
     value = 2 * one_node_value
-    current_timestamp = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
+    current_timestamp = testerchain.get_blocktime()
     end_timestamp = current_timestamp + (number_of_periods - 1) * one_period
-    tx = policy_manager.functions.createPolicy(policy_id_1, alice1, end_timestamp, [staker1, staker2]) \
-        .transact({'from': alice1, 'value': value, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-
-    policy_id_2 = os.urandom(16)
-    tx = policy_manager.functions.createPolicy(
-        policy_id_2, alice2, end_timestamp, [staker2, preallocation_escrow_1.address]) \
-        .transact({'from': alice1, 'value': value, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-
-    policy_id_3 = os.urandom(16)
-    tx = policy_manager.functions.createPolicy(
-        policy_id_3, BlockchainInterface.NULL_ADDRESS, end_timestamp, [staker1, preallocation_escrow_1.address]) \
-        .transact({'from': alice2, 'value': value, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-
-    policy_id_4 = os.urandom(16)
-    tx = policy_manager.functions.createPolicy(
-        policy_id_4, alice1, end_timestamp, [staker2, preallocation_escrow_1.address]) \
-        .transact({'from': alice2, 'value': value, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-
-    policy_id_5 = os.urandom(16)
-    tx = policy_manager.functions.createPolicy(
-        policy_id_5, alice1, end_timestamp, [staker1, staker2]) \
-        .transact({'from': alice2, 'value': value, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    policies = (
+        (policy_id_1, alice1, [staker1, staker2], alice1),
+        (policy_id_2, alice2, [staker2, preallocation_escrow_1.address], alice1),
+        (policy_id_3, BlockchainInterface.NULL_ADDRESS, [staker1, preallocation_escrow_1.address], alice2),
+        (policy_id_4, alice1, [staker2, preallocation_escrow_1.address], alice2),
+        (policy_id_5, alice1, [staker1, staker2], alice2),
+    )
+    # Alices create several policies each, so these can't share a block in eth-tester
+    for policy_id, policy_owner, nodes, sender in policies:
+        create_policy = policy_manager.functions.createPolicy(policy_id, policy_owner, end_timestamp, nodes)
+        testerchain.transact_nowait(create_policy, {'from': sender, 'value': value, 'gas_price': 0})
     assert 5 * value == testerchain.client.get_balance(policy_manager.address)
 
     # Only Alice can revoke policy
     with pytest.raises((TransactionFailed, ValueError)):
         tx = policy_manager.functions.revokePolicy(policy_id_5).transact({'from': staker1})
         testerchain.wait_for_receipt(tx)
-    alice2_balance = testerchain.client.get_balance(alice2)
-    tx = policy_manager.functions.revokePolicy(policy_id_5).transact({'from': alice1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    before = snapshot_balances(testerchain, alice2)
+    testerchain.transact_nowait(policy_manager.functions.revokePolicy(policy_id_5), {'from': alice1, 'gas_price': 0})
     two_nodes_rate = 2 * rate
-    assert 4 * value + two_nodes_rate == testerchain.client.get_balance(policy_manager.address)
-    assert alice2_balance + (value - two_nodes_rate) == testerchain.client.get_balance(alice2)
+    after = snapshot_balances(testerchain, policy_manager.address, alice2)
+    assert 4 * value + two_nodes_rate == after[policy_manager.address]
+    assert before[alice2] + (value - two_nodes_rate) == after[alice2]
     assert policy_manager.functions.policies(policy_id_5).call()[DISABLED_FIELD]
 
     # Can't revoke again
@@ -654,12 +736,13 @@ def test_all(testerchain,
         tx = policy_manager.functions.revokeArrangement(policy_id_5, staker1).transact({'from': alice2})
         testerchain.wait_for_receipt(tx)
 
-    alice1_balance = testerchain.client.get_balance(alice1)
-    tx = policy_manager.functions.revokeArrangement(policy_id_2, staker2).transact({'from': alice2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    before = snapshot_balances(testerchain, alice1)
+    testerchain.transact_nowait(policy_manager.functions.revokeArrangement(policy_id_2, staker2),
+                                {'from': alice2, 'gas_price': 0})
     remaining_value = 3 * value + two_nodes_rate + one_node_value + rate
-    assert remaining_value == testerchain.client.get_balance(policy_manager.address)
-    assert alice1_balance + one_node_value - rate == testerchain.client.get_balance(alice1)
+    after = snapshot_balances(testerchain, policy_manager.address, alice1)
+    assert remaining_value == after[policy_manager.address]
+    assert before[alice1] + one_node_value - rate == after[alice1]
     assert not policy_manager.functions.policies(policy_id_2).call()[DISABLED_FIELD]
 
     # Can't revoke again
@@ -670,12 +753,7 @@ def test_all(testerchain,
 
     # Wait, confirm activity, mint
     testerchain.time_travel(hours=1)
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    confirm_activity(testerchain, escrow, staker1, staker2, staker3)
 
     # Check work measurement
     completed_work = escrow.functions.getCompletedWork(staker2).call()
@@ -688,96 +766,76 @@ def test_all(testerchain,
         .transact({'from': alice2, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
 
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    confirm_activity(testerchain, escrow, staker1, staker2, staker3)
 
     # Turn off re-stake for staker1
     assert not escrow.functions.stakerInfo(staker1).call()[DISABLE_RE_STAKE_FIELD]
-    tx = escrow.functions.setReStake(False).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.setReStake(False), {'from': staker1})
     assert escrow.functions.stakerInfo(staker1).call()[DISABLE_RE_STAKE_FIELD]
 
     testerchain.time_travel(hours=1)
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.confirmActivity(), {'from': staker1})
 
     testerchain.time_travel(hours=1)
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.confirmActivity(), {'from': staker1})
 
     # Withdraw reward and refund
     testerchain.time_travel(hours=3)
-    staker1_balance = testerchain.client.get_balance(staker1)
-    tx = policy_manager.functions.withdraw().transact({'from': staker1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert staker1_balance < testerchain.client.get_balance(staker1)
-    staker2_balance = testerchain.client.get_balance(staker2)
-    tx = policy_manager.functions.withdraw().transact({'from': staker2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert staker2_balance < testerchain.client.get_balance(staker2)
-    staker3_balance = testerchain.client.get_balance(staker3)
-    tx = preallocation_escrow_interface_1.functions.withdrawPolicyReward(staker3).transact({'from': staker3, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert staker3_balance < testerchain.client.get_balance(staker3)
+    before = snapshot_balances(testerchain, staker1, staker2, staker3)
+    testerchain.transact_batch([
+        (policy_manager.functions.withdraw(), {'from': staker1, 'gas_price': 0}),
+        (policy_manager.functions.withdraw(), {'from': staker2, 'gas_price': 0}),
+        (preallocation_escrow_interface_1.functions.withdrawPolicyReward(staker3), {'from': staker3, 'gas_price': 0})
+    ])
+    after = snapshot_balances(testerchain, staker1, staker2, staker3)
+    assert all(before[staker] < after[staker] for staker in (staker1, staker2, staker3))
+
+    # Each refund is checked on its own, so a zero refund of any policy is noticed
+    refunds = ((policy_id_1, alice1, alice1, operator.lt),
+               (policy_id_2, alice1, alice1, operator.lt),
+               (policy_id_3, alice2, alice2, operator.eq),
+               (policy_id_4, alice1, alice2, operator.lt))
+    for policy_id, sender, payee, compare in refunds:
+        balance = testerchain.client.get_balance(payee)
+        testerchain.transact_nowait(policy_manager.functions.refund(policy_id), {'from': sender, 'gas_price': 0})
+        assert compare(balance, testerchain.client.get_balance(payee))
 
-    alice1_balance = testerchain.client.get_balance(alice1)
-    tx = policy_manager.functions.refund(policy_id_1).transact({'from': alice1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert alice1_balance < testerchain.client.get_balance(alice1)
-    alice1_balance = testerchain.client.get_balance(alice1)
-    tx = policy_manager.functions.refund(policy_id_2).transact({'from': alice1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert alice1_balance < testerchain.client.get_balance(alice1)
-    alice2_balance = testerchain.client.get_balance(alice2)
-    tx = policy_manager.functions.refund(policy_id_3).transact({'from': alice2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert alice2_balance == testerchain.client.get_balance(alice2)
-    tx = policy_manager.functions.refund(policy_id_4).transact({'from': alice1, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
-    assert alice2_balance < testerchain.client.get_balance(alice2)
+
+@pytest.mark.slow
+def test_upgrading(testerchain,
+                   accounts,
+                   contracts_owners,
+                   token_economics,
+                   token,
+                   escrow,
+                   policy_manager,
+                   multisig,
+                   deployment_secrets,
+                   upgrade_secrets,
+                   deploy_contract):
+    escrow, escrow_dispatcher = escrow
+    policy_manager, policy_manager_dispatcher = policy_manager
+    escrow_secret = deployment_secrets['escrow']
+    policy_manager_secret = deployment_secrets['policy_manager']
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
 
     # Upgrade main contracts
-    escrow_secret2 = os.urandom(SECRET_LENGTH)
-    policy_manager_secret2 = os.urandom(SECRET_LENGTH)
-    escrow_secret2_hash = testerchain.w3.keccak(escrow_secret2)
-    policy_manager_secret2_hash = testerchain.w3.keccak(policy_manager_secret2)
-    escrow_v1 = escrow.functions.target().call()
-    policy_manager_v1 = policy_manager.functions.target().call()
+    (_escrow_secret2, escrow_secret2_hash), _ = upgrade_secrets['escrow']
+    (_policy_manager_secret2, policy_manager_secret2_hash), _ = upgrade_secrets['policy_manager']
     # Creator deploys the contracts as the second versions
     escrow_v2, _ = deploy_contract(
         'StakingEscrow', token.address, *token_economics.staking_deployment_parameters, False
     )
     policy_manager_v2, _ = deploy_contract('PolicyManager', escrow.address)
+    escrow_upgrade = escrow_dispatcher.functions.upgrade(escrow_v2.address, escrow_secret, escrow_secret2_hash)
+    policy_manager_upgrade = policy_manager_dispatcher.functions \
+        .upgrade(policy_manager_v2.address, policy_manager_secret, policy_manager_secret2_hash)
     # Staker and Alice can't upgrade contracts, only owner can
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = escrow_dispatcher.functions.upgrade(escrow_v2.address, escrow_secret, escrow_secret2_hash) \
-            .transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = escrow_dispatcher.functions.upgrade(escrow_v2.address, escrow_secret, escrow_secret2_hash) \
-            .transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager_dispatcher.functions \
-            .upgrade(policy_manager_v2.address, policy_manager_secret, policy_manager_secret2_hash) \
-            .transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager_dispatcher.functions \
-            .upgrade(policy_manager_v2.address, policy_manager_secret, policy_manager_secret2_hash) \
-            .transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((escrow_upgrade, policy_manager_upgrade), senders=(alice1, staker1))
 
     # Prepare transactions to upgrade contracts
-    tx1 = escrow_dispatcher.functions.upgrade(escrow_v2.address, escrow_secret, escrow_secret2_hash)\
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
-    tx2 = policy_manager_dispatcher.functions\
-        .upgrade(policy_manager_v2.address, policy_manager_secret, policy_manager_secret2_hash)\
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx1 = escrow_upgrade.buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx2 = policy_manager_upgrade.buildTransaction({'from': multisig.address, 'gasPrice': 0})
     # Staker and Alice can't sign this transactions
     with pytest.raises((TransactionFailed, ValueError)):
         execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], staker1], tx1)
@@ -794,31 +852,42 @@ def test_all(testerchain,
     assert escrow_v2.address == escrow.functions.target().call()
     assert policy_manager_v2.address == policy_manager.functions.target().call()
 
+
+@pytest.mark.slow
+def test_rollback(testerchain,
+                  accounts,
+                  contracts_owners,
+                  token,
+                  escrow,
+                  policy_manager,
+                  staking_interface,
+                  multisig,
+                  deployment_secrets,
+                  upgrade_secrets,
+                  deploy_contract):
+    escrow, escrow_dispatcher = escrow
+    policy_manager, policy_manager_dispatcher = policy_manager
+    _staking_interface, staking_interface_router = staking_interface
+    router_secret = deployment_secrets['router']
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
+
+    # Contracts were upgraded in the previous test
+    (escrow_secret2, _), (_escrow_secret3, escrow_secret3_hash) = upgrade_secrets['escrow']
+    (policy_manager_secret2, _), (_policy_manager_secret3, policy_manager_secret3_hash) = \
+        upgrade_secrets['policy_manager']
+    (_router_secret2, router_secret2_hash), _ = upgrade_secrets['router']
+    escrow_v1 = escrow.functions.previousTarget().call()
+    policy_manager_v1 = policy_manager.functions.previousTarget().call()
+
+    escrow_rollback = escrow_dispatcher.functions.rollback(escrow_secret2, escrow_secret3_hash)
+    policy_manager_rollback = policy_manager_dispatcher.functions \
+        .rollback(policy_manager_secret2, policy_manager_secret3_hash)
     # Staker and Alice can't rollback contracts, only owner can
-    escrow_secret3 = os.urandom(SECRET_LENGTH)
-    policy_manager_secret3 = os.urandom(SECRET_LENGTH)
-    escrow_secret3_hash = testerchain.w3.keccak(escrow_secret3)
-    policy_manager_secret3_hash = testerchain.w3.keccak(policy_manager_secret3)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = escrow_dispatcher.functions.rollback(escrow_secret2, escrow_secret3_hash).transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = escrow_dispatcher.functions.rollback(escrow_secret2, escrow_secret3_hash).transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager_dispatcher.functions.rollback(policy_manager_secret2, policy_manager_secret3_hash) \
-            .transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager_dispatcher.functions.rollback(policy_manager_secret2, policy_manager_secret3_hash) \
-            .transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((escrow_rollback, policy_manager_rollback), senders=(alice1, staker1))
 
     # Prepare transactions to rollback contracts
-    tx1 = escrow_dispatcher.functions.rollback(escrow_secret2, escrow_secret3_hash) \
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
-    tx2 = policy_manager_dispatcher.functions.rollback(policy_manager_secret2, policy_manager_secret3_hash) \
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx1 = escrow_rollback.buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx2 = policy_manager_rollback.buildTransaction({'from': multisig.address, 'gasPrice': 0})
     # Staker and Alice can't sign this transactions
     with pytest.raises((TransactionFailed, ValueError)):
         execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], staker1], tx1)
@@ -839,24 +908,13 @@ def test_all(testerchain,
     # Deploy the same contract as the second version
     staking_interface_v2, _ = deploy_contract(
         'StakingInterface', token.address, escrow.address, policy_manager.address)
-    router_secret2 = os.urandom(SECRET_LENGTH)
-    router_secret2_hash = testerchain.w3.keccak(router_secret2)
+    router_upgrade = staking_interface_router.functions \
+        .upgrade(staking_interface_v2.address, router_secret, router_secret2_hash)
     # Staker and Alice can't upgrade library, only owner can
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = staking_interface_router.functions \
-            .upgrade(staking_interface_v2.address, router_secret, router_secret2_hash) \
-            .transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = staking_interface_router.functions \
-            .upgrade(staking_interface_v2.address, router_secret, router_secret2_hash) \
-            .transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((router_upgrade,), senders=(alice1, staker1))
 
     # Prepare transactions to upgrade library
-    tx = staking_interface_router.functions \
-        .upgrade(staking_interface_v2.address, router_secret, router_secret2_hash)\
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx = router_upgrade.buildTransaction({'from': multisig.address, 'gasPrice': 0})
     # Staker and Alice can't sign this transactions
     with pytest.raises((TransactionFailed, ValueError)):
         execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], staker1], tx)
@@ -867,99 +925,81 @@ def test_all(testerchain,
     execute_multisig_transaction(testerchain, multisig, [contracts_owners[1], contracts_owners[2]], tx)
     assert staking_interface_v2.address == staking_interface_router.functions.target().call()
 
+
+@pytest.mark.slow
+def test_slashing(testerchain,
+                  accounts,
+                  contracts_owners,
+                  token_economics,
+                  token,
+                  escrow,
+                  adjudicator,
+                  multisig,
+                  preallocation_escrow_1,
+                  deployment_secrets,
+                  upgrade_secrets,
+                  slashing_evidence,
+                  deploy_contract,
+                  batch_call):
+    escrow, _escrow_dispatcher = escrow
+    adjudicator, adjudicator_dispatcher = adjudicator
+    preallocation_escrow_1, _preallocation_escrow_interface_1 = preallocation_escrow_1
+    adjudicator_secret = deployment_secrets['adjudicator']
+    (adjudicator_secret2, adjudicator_secret2_hash), (_adjudicator_secret3, adjudicator_secret3_hash) = \
+        upgrade_secrets['adjudicator']
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
+
     # Slash stakers
     # Confirm activity for two periods
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
-    testerchain.time_travel(hours=1)
-    tx = escrow.functions.confirmActivity().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.confirmActivity().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
-    testerchain.time_travel(hours=1)
+    confirm_activity_for_periods(testerchain, escrow, 2, staker1, staker2, staker3)
 
     # Can't slash directly using the escrow contract
     with pytest.raises((TransactionFailed, ValueError)):
         tx = escrow.functions.slashStaker(staker1, 100, alice1, 10).transact()
         testerchain.wait_for_receipt(tx)
 
-    # Slash part of the free amount of tokens
-    current_period = escrow.functions.getCurrentPeriod().call()
-    tokens_amount = escrow.functions.getAllTokens(staker1).call()
-    previous_lock = escrow.functions.getLockedTokensInPast(staker1, 1).call()
-    lock = escrow.functions.getLockedTokens(staker1, 0).call()
-    next_lock = escrow.functions.getLockedTokens(staker1, 1).call()
-    total_previous_lock = escrow.functions.lockedPerPeriod(current_period - 1).call()
-    total_lock = escrow.functions.lockedPerPeriod(current_period).call()
-    alice1_balance = token.functions.balanceOf(alice1).call()
-
     algorithm_sha256, base_penalty, *coefficients = token_economics.slashing_deployment_parameters
     penalty_history_coefficient, percentage_penalty_coefficient, reward_coefficient = coefficients
+    current_period = escrow.functions.getCurrentPeriod().call()
+    reward = base_penalty / reward_coefficient
 
-    data_hash, slashing_args = generate_args_for_slashing(mock_ursula_reencrypts, ursula1_with_stamp)
-    assert not adjudicator.functions.evaluatedCFrags(data_hash).call()
-    tx = adjudicator.functions.evaluateCFrag(*slashing_args).transact({'from': alice1})
-    testerchain.wait_for_receipt(tx)
-    assert adjudicator.functions.evaluatedCFrags(data_hash).call()
-    assert tokens_amount - base_penalty == escrow.functions.getAllTokens(staker1).call()
-    assert previous_lock == escrow.functions.getLockedTokensInPast(staker1, 1).call()
-    assert lock == escrow.functions.getLockedTokens(staker1, 0).call()
-    assert next_lock == escrow.functions.getLockedTokens(staker1, 1).call()
-    assert total_previous_lock == escrow.functions.lockedPerPeriod(current_period - 1).call()
-    assert total_lock == escrow.functions.lockedPerPeriod(current_period).call()
-    assert 0 == escrow.functions.lockedPerPeriod(current_period + 1).call()
-    assert alice1_balance + base_penalty / reward_coefficient == token.functions.balanceOf(alice1).call()
+    # The scenarios below are not isolated with snapshots: the final slashing of staker1's two sub stakes
+    # is priced by the penalty history left by the first one, and the adjudicator upgrade runs on the slashed state
+
+    # Slash part of the free amount of tokens
+    pre = read_slash_state(batch_call, escrow, token, staker1, alice1, current_period)
+    evaluate_cfrag(testerchain, adjudicator, alice1, slashing_evidence[staker1].pop())
+    assert_slashed(pre, read_slash_state(batch_call, escrow, token, staker1, alice1, current_period),
+                   tokens=pre.tokens - base_penalty,
+                   next_total_lock=0,
+                   investigator_balance=pre.investigator_balance + reward)
 
     # Slash part of the one sub stake
-    tokens_amount = escrow.functions.getAllTokens(staker2).call()
-    unlocked_amount = tokens_amount - escrow.functions.getLockedTokens(staker2, 0).call()
-    tx = escrow.functions.withdraw(unlocked_amount).transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    previous_lock = escrow.functions.getLockedTokensInPast(staker2, 1).call()
-    lock = escrow.functions.getLockedTokens(staker2, 0).call()
-    next_lock = escrow.functions.getLockedTokens(staker2, 1).call()
-    data_hash, slashing_args = generate_args_for_slashing(mock_ursula_reencrypts, ursula2_with_stamp)
-    assert not adjudicator.functions.evaluatedCFrags(data_hash).call()
-    tx = adjudicator.functions.evaluateCFrag(*slashing_args).transact({'from': alice1})
-    testerchain.wait_for_receipt(tx)
-    assert adjudicator.functions.evaluatedCFrags(data_hash).call()
-    assert lock - base_penalty == escrow.functions.getAllTokens(staker2).call()
-    assert previous_lock == escrow.functions.getLockedTokensInPast(staker2, 1).call()
-    assert lock - base_penalty == escrow.functions.getLockedTokens(staker2, 0).call()
-    assert next_lock - base_penalty == escrow.functions.getLockedTokens(staker2, 1).call()
-    assert total_previous_lock == escrow.functions.lockedPerPeriod(current_period - 1).call()
-    assert total_lock - base_penalty == escrow.functions.lockedPerPeriod(current_period).call()
-    assert 0 == escrow.functions.lockedPerPeriod(current_period + 1).call()
-    assert alice1_balance + base_penalty == token.functions.balanceOf(alice1).call()
+    tokens_amount, locked_amount = batch_call(escrow.functions.getAllTokens(staker2),
+                                              escrow.functions.getLockedTokens(staker2, 0))
+    unlocked_amount = tokens_amount - locked_amount
+    testerchain.transact_nowait(escrow.functions.withdraw(unlocked_amount), {'from': staker2})
+    pre = read_slash_state(batch_call, escrow, token, staker2, alice1, current_period)
+    evaluate_cfrag(testerchain, adjudicator, alice1, slashing_evidence[staker2].pop())
+    assert_slashed(pre, read_slash_state(batch_call, escrow, token, staker2, alice1, current_period),
+                   tokens=pre.lock - base_penalty,
+                   lock=pre.lock - base_penalty,
+                   next_lock=pre.next_lock - base_penalty,
+                   total_lock=pre.total_lock - base_penalty,
+                   next_total_lock=0,
+                   investigator_balance=pre.investigator_balance + reward)
 
     # Slash preallocation escrow
-    tokens_amount = escrow.functions.getAllTokens(preallocation_escrow_1.address).call()
-    previous_lock = escrow.functions.getLockedTokensInPast(preallocation_escrow_1.address, 1).call()
-    lock = escrow.functions.getLockedTokens(preallocation_escrow_1.address, 0).call()
-    next_lock = escrow.functions.getLockedTokens(preallocation_escrow_1.address, 1).call()
-    total_previous_lock = escrow.functions.lockedPerPeriod(current_period - 1).call()
-    total_lock = escrow.functions.lockedPerPeriod(current_period).call()
-    alice1_balance = token.functions.balanceOf(alice1).call()
-
-    data_hash, slashing_args = generate_args_for_slashing(mock_ursula_reencrypts, ursula3_with_stamp)
-    assert not adjudicator.functions.evaluatedCFrags(data_hash).call()
-    tx = adjudicator.functions.evaluateCFrag(*slashing_args).transact({'from': alice1})
-    testerchain.wait_for_receipt(tx)
-    assert adjudicator.functions.evaluatedCFrags(data_hash).call()
-    assert tokens_amount - base_penalty == escrow.functions.getAllTokens(preallocation_escrow_1.address).call()
-    assert previous_lock == escrow.functions.getLockedTokensInPast(preallocation_escrow_1.address, 1).call()
-    assert lock - base_penalty == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 0).call()
-    assert next_lock - base_penalty == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 1).call()
-    assert total_previous_lock == escrow.functions.lockedPerPeriod(current_period - 1).call()
-    assert total_lock - base_penalty == escrow.functions.lockedPerPeriod(current_period).call()
-    assert 0 == escrow.functions.lockedPerPeriod(current_period + 1).call()
-    assert alice1_balance + base_penalty / reward_coefficient == token.functions.balanceOf(alice1).call()
+    pre = read_slash_state(batch_call, escrow, token, preallocation_escrow_1.address, alice1, current_period)
+    evaluate_cfrag(testerchain, adjudicator, alice1, slashing_evidence[staker3].pop())
+    assert_slashed(pre,
+                   read_slash_state(batch_call, escrow, token, preallocation_escrow_1.address, alice1, current_period),
+                   tokens=pre.tokens - base_penalty,
+                   lock=pre.lock - base_penalty,
+                   next_lock=pre.next_lock - base_penalty,
+                   total_lock=pre.total_lock - base_penalty,
+                   next_total_lock=0,
+                   investigator_balance=pre.investigator_balance + reward)
 
     # Upgrade the adjudicator
     # Deploy the same contract as the second version
@@ -968,24 +1008,13 @@ def test_all(testerchain,
         'Adjudicator',
         escrow.address,
         *token_economics.slashing_deployment_parameters)
-    adjudicator_secret2 = os.urandom(SECRET_LENGTH)
-    adjudicator_secret2_hash = testerchain.w3.keccak(adjudicator_secret2)
+    adjudicator_upgrade = adjudicator_dispatcher.functions \
+        .upgrade(adjudicator_v2.address, adjudicator_secret, adjudicator_secret2_hash)
     # Staker and Alice can't upgrade library, only owner can
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = adjudicator_dispatcher.functions \
-            .upgrade(adjudicator_v2.address, adjudicator_secret, adjudicator_secret2_hash) \
-            .transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = adjudicator_dispatcher.functions \
-            .upgrade(adjudicator_v2.address, adjudicator_secret, adjudicator_secret2_hash) \
-            .transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((adjudicator_upgrade,), senders=(alice1, staker1))
 
     # Prepare transactions to upgrade contracts
-    tx = adjudicator_dispatcher.functions\
-        .upgrade(adjudicator_v2.address, adjudicator_secret, adjudicator_secret2_hash) \
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx = adjudicator_upgrade.buildTransaction({'from': multisig.address, 'gasPrice': 0})
     # Staker and Alice can't sign this transactions
     with pytest.raises((TransactionFailed, ValueError)):
         execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], staker1], tx)
@@ -996,21 +1025,12 @@ def test_all(testerchain,
     execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], contracts_owners[1]], tx)
     assert adjudicator_v2.address == adjudicator.functions.target().call()
 
+    adjudicator_rollback = adjudicator_dispatcher.functions.rollback(adjudicator_secret2, adjudicator_secret3_hash)
     # Staker and Alice can't rollback contract, only owner can
-    adjudicator_secret3 = os.urandom(SECRET_LENGTH)
-    adjudicator_secret3_hash = testerchain.w3.keccak(adjudicator_secret3)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = adjudicator_dispatcher.functions.rollback(adjudicator_secret2, adjudicator_secret3_hash)\
-            .transact({'from': alice1})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = adjudicator_dispatcher.functions.rollback(adjudicator_secret2, adjudicator_secret3_hash)\
-            .transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((adjudicator_rollback,), senders=(alice1, staker1))
 
     # Prepare transactions to rollback contracts
-    tx = adjudicator_dispatcher.functions.rollback(adjudicator_secret2, adjudicator_secret3_hash) \
-        .buildTransaction({'from': multisig.address, 'gasPrice': 0})
+    tx = adjudicator_rollback.buildTransaction({'from': multisig.address, 'gasPrice': 0})
     # Staker and Alice can't sign this transactions
     with pytest.raises((TransactionFailed, ValueError)):
         execute_multisig_transaction(testerchain, multisig, [contracts_owners[0], staker1], tx)
@@ -1022,34 +1042,37 @@ def test_all(testerchain,
     assert adjudicator_v1 == adjudicator.functions.target().call()
 
     # Slash two sub stakes
-    tokens_amount = escrow.functions.getAllTokens(staker1).call()
-    unlocked_amount = tokens_amount - escrow.functions.getLockedTokens(staker1, 0).call()
-    tx = escrow.functions.withdraw(unlocked_amount).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    previous_lock = escrow.functions.getLockedTokensInPast(staker1, 1).call()
-    lock = escrow.functions.getLockedTokens(staker1, 0).call()
-    next_lock = escrow.functions.getLockedTokens(staker1, 1).call()
-    total_lock = escrow.functions.lockedPerPeriod(current_period).call()
-    alice2_balance = token.functions.balanceOf(alice2).call()
-    data_hash, slashing_args = generate_args_for_slashing(mock_ursula_reencrypts, ursula1_with_stamp)
-    assert not adjudicator.functions.evaluatedCFrags(data_hash).call()
-    tx = adjudicator.functions.evaluateCFrag(*slashing_args).transact({'from': alice2})
-    testerchain.wait_for_receipt(tx)
-    assert adjudicator.functions.evaluatedCFrags(data_hash).call()
-    data_hash, slashing_args = generate_args_for_slashing(mock_ursula_reencrypts, ursula1_with_stamp)
-    assert not adjudicator.functions.evaluatedCFrags(data_hash).call()
-    tx = adjudicator.functions.evaluateCFrag(*slashing_args).transact({'from': alice2})
-    testerchain.wait_for_receipt(tx)
-    assert adjudicator.functions.evaluatedCFrags(data_hash).call()
+    tokens_amount, locked_amount = batch_call(escrow.functions.getAllTokens(staker1),
+                                              escrow.functions.getLockedTokens(staker1, 0))
+    unlocked_amount = tokens_amount - locked_amount
+    testerchain.transact_nowait(escrow.functions.withdraw(unlocked_amount), {'from': staker1})
+    pre = read_slash_state(batch_call, escrow, token, staker1, alice2, current_period)
+    for evidence in slashing_evidence.pop(staker1):
+        evaluate_cfrag(testerchain, adjudicator, alice2, evidence)
     penalty = (2 * base_penalty + 3 * penalty_history_coefficient)
-    assert lock - penalty == escrow.functions.getAllTokens(staker1).call()
-    assert previous_lock == escrow.functions.getLockedTokensInPast(staker1, 1).call()
-    assert lock - penalty == escrow.functions.getLockedTokens(staker1, 0).call()
-    assert next_lock - (penalty - (lock - next_lock)) == escrow.functions.getLockedTokens(staker1, 1).call()
-    assert total_previous_lock == escrow.functions.lockedPerPeriod(current_period - 1).call()
-    assert total_lock - penalty == escrow.functions.lockedPerPeriod(current_period).call()
-    assert 0 == escrow.functions.lockedPerPeriod(current_period + 1).call()
-    assert alice2_balance + penalty / reward_coefficient == token.functions.balanceOf(alice2).call()
+    assert_slashed(pre, read_slash_state(batch_call, escrow, token, staker1, alice2, current_period),
+                   tokens=pre.lock - penalty,
+                   lock=pre.lock - penalty,
+                   next_lock=pre.next_lock - (penalty - (pre.lock - pre.next_lock)),
+                   total_lock=pre.total_lock - penalty,
+                   next_total_lock=0,
+                   investigator_balance=pre.investigator_balance + penalty / reward_coefficient)
+
+
+@pytest.mark.slow
+def test_unlock_and_refund(testerchain,
+                           accounts,
+                           token,
+                           escrow,
+                           worklock,
+                           preallocation_escrow_1,
+                           preallocation_escrow_2,
+                           batch_call):
+    escrow, _escrow_dispatcher = escrow
+    preallocation_escrow_1, preallocation_escrow_interface_1 = preallocation_escrow_1
+    creator, staker1, staker2, staker3, staker4, alice1, alice2 = accounts[:7]
+
+    completed_work = escrow.functions.getCompletedWork(staker2).call()
 
     # Can't prolong stake by too low duration
     with pytest.raises((TransactionFailed, ValueError)):
@@ -1057,14 +1080,7 @@ def test_all(testerchain,
         testerchain.wait_for_receipt(tx)
 
     # Unlock and withdraw all tokens
-    for index in range(9):
-        tx = escrow.functions.confirmActivity().transact({'from': staker1})
-        testerchain.wait_for_receipt(tx)
-        tx = escrow.functions.confirmActivity().transact({'from': staker2})
-        testerchain.wait_for_receipt(tx)
-        tx = escrow.functions.confirmActivity().transact({'from': staker3})
-        testerchain.wait_for_receipt(tx)
-        testerchain.time_travel(hours=1)
+    confirm_activity_for_periods(testerchain, escrow, 9, staker1, staker2, staker3)
 
     # Can't unlock re-stake parameter yet
     with pytest.raises((TransactionFailed, ValueError)):
@@ -1073,64 +1089,62 @@ def test_all(testerchain,
 
     testerchain.time_travel(hours=1)
     # Now can turn off re-stake
-    tx = preallocation_escrow_interface_1.functions.setReStake(False).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.setReStake(False), {'from': staker3})
     assert escrow.functions.stakerInfo(preallocation_escrow_1.address).call()[DISABLE_RE_STAKE_FIELD]
 
-    tx = escrow.functions.mint().transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.mint().transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
-    tx = preallocation_escrow_interface_1.functions.mint().transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.mint(), {'from': staker1})
+    testerchain.transact_nowait(escrow.functions.mint(), {'from': staker2})
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.mint(), {'from': staker3})
 
-    assert 0 == escrow.functions.getLockedTokens(staker1, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(staker2, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(staker3, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(staker4, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(preallocation_escrow_1.address, 0).call()
-    assert 0 == escrow.functions.getLockedTokens(preallocation_escrow_2.address, 0).call()
+    stakers = (staker1, staker2, staker3, staker4, preallocation_escrow_1.address, preallocation_escrow_2.address)
+    assert not any(batch_call(*(escrow.functions.getLockedTokens(staker, 0) for staker in stakers)))
 
-    staker1_balance = token.functions.balanceOf(staker1).call()
-    staker2_balance = token.functions.balanceOf(staker2).call()
-    preallocation_escrow_1_balance = token.functions.balanceOf(preallocation_escrow_1.address).call()
+    staker1_balance, staker2_balance, preallocation_escrow_1_balance = batch_call(
+        token.functions.balanceOf(staker1),
+        token.functions.balanceOf(staker2),
+        token.functions.balanceOf(preallocation_escrow_1.address))
     tokens_amount = escrow.functions.getAllTokens(staker1).call()
-    tx = escrow.functions.withdraw(tokens_amount).transact({'from': staker1})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.withdraw(tokens_amount), {'from': staker1})
     tokens_amount = escrow.functions.getAllTokens(staker2).call()
-    tx = escrow.functions.withdraw(tokens_amount).transact({'from': staker2})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(escrow.functions.withdraw(tokens_amount), {'from': staker2})
     tokens_amount = escrow.functions.getAllTokens(preallocation_escrow_1.address).call()
-    tx = preallocation_escrow_interface_1.functions.withdrawAsStaker(tokens_amount).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
-    assert staker1_balance < token.functions.balanceOf(staker1).call()
-    assert staker2_balance < token.functions.balanceOf(staker2).call()
-    assert preallocation_escrow_1_balance < token.functions.balanceOf(preallocation_escrow_1.address).call()
+    testerchain.transact_nowait(preallocation_escrow_interface_1.functions.withdrawAsStaker(tokens_amount),
+                                {'from': staker3})
+    new_staker1_balance, new_staker2_balance, new_preallocation_escrow_1_balance = batch_call(
+        token.functions.balanceOf(staker1),
+        token.functions.balanceOf(staker2),
+        token.functions.balanceOf(preallocation_escrow_1.address))
+    assert staker1_balance < new_staker1_balance
+    assert staker2_balance < new_staker2_balance
+    assert preallocation_escrow_1_balance < new_preallocation_escrow_1_balance
 
     # Unlock and withdraw all tokens in PreallocationEscrow
     testerchain.time_travel(hours=1)
-    assert 0 == preallocation_escrow_1.functions.getLockedTokens().call()
-    assert 0 == preallocation_escrow_2.functions.getLockedTokens().call()
-    staker3_balance = token.functions.balanceOf(staker3).call()
-    staker4_balance = token.functions.balanceOf(staker4).call()
-    tokens_amount = token.functions.balanceOf(preallocation_escrow_1.address).call()
-    tx = preallocation_escrow_1.functions.withdrawTokens(tokens_amount).transact({'from': staker3})
-    testerchain.wait_for_receipt(tx)
-    tokens_amount = token.functions.balanceOf(preallocation_escrow_2.address).call()
-    tx = preallocation_escrow_2.functions.withdrawTokens(tokens_amount).transact({'from': staker4})
-    testerchain.wait_for_receipt(tx)
-    assert staker3_balance < token.functions.balanceOf(staker3).call()
-    assert staker4_balance < token.functions.balanceOf(staker4).call()
+    locked_1, locked_2, staker3_balance, staker4_balance, tokens_amount_1, tokens_amount_2 = batch_call(
+        preallocation_escrow_1.functions.getLockedTokens(),
+        preallocation_escrow_2.functions.getLockedTokens(),
+        token.functions.balanceOf(staker3),
+        token.functions.balanceOf(staker4),
+        token.functions.balanceOf(preallocation_escrow_1.address),
+        token.functions.balanceOf(preallocation_escrow_2.address))
+    assert 0 == locked_1
+    assert 0 == locked_2
+    testerchain.transact_nowait(preallocation_escrow_1.functions.withdrawTokens(tokens_amount_1), {'from': staker3})
+    testerchain.transact_nowait(preallocation_escrow_2.functions.withdrawTokens(tokens_amount_2), {'from': staker4})
+    new_staker3_balance, new_staker4_balance = batch_call(token.functions.balanceOf(staker3),
+                                                          token.functions.balanceOf(staker4))
+    assert staker3_balance < new_staker3_balance
+    assert staker4_balance < new_staker4_balance
 
     # Partial refund for staker
+    deposited_eth_1, deposited_eth_2 = DEPOSITED_ETH_1, DEPOSITED_ETH_2
     new_completed_work = escrow.functions.getCompletedWork(staker2).call()
     assert completed_work < new_completed_work
     remaining_work = worklock.functions.getRemainingWork(staker2).call()
     assert 0 < remaining_work
     assert deposited_eth_1 == worklock.functions.workInfo(staker2).call()[0]
     staker2_balance = testerchain.w3.eth.getBalance(staker2)
-    tx = worklock.functions.refund().transact({'from': staker2, 'gas_price': 0})
-    testerchain.wait_for_receipt(tx)
+    testerchain.transact_nowait(worklock.functions.refund(), {'from': staker2, 'gas_price': 0})
     refund = worklock.functions.workToETH(new_completed_work).call()
     assert deposited_eth_1 - refund == worklock.functions.workInfo(staker2).call()[0]
     assert refund + staker2_balance == testerchain.w3.eth.getBalance(staker2)
@@ -0,0 +1,60 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+
+import os
+
+import pytest
+from eth_tester.exceptions import TransactionFailed
+from eth_utils import to_bytes
+
+
+@pytest.fixture()
+def approval_mock(testerchain, deploy_contract):
+    contract, _ = deploy_contract('ReceiveApprovalMethodMock')
+    sender, token = testerchain.client.accounts[1:3]
+    tx = contract.functions.receiveApproval(sender, 100, token, os.urandom(40)).transact()
+    testerchain.wait_for_receipt(tx)
+    return contract
+
+
+@pytest.mark.slow
+def test_aggregate(testerchain, deploy_contract, approval_mock):
+    multicall, _ = deploy_contract('Multicall')
+    call_data = [to_bytes(hexstr=approval_mock.encodeABI(fn_name=getter))
+                 for getter in ('sender', 'value', 'tokenContract', 'extraData')]
+    targets = [approval_mock.address] * len(call_data)
+
+    # Each call returns the raw output of its target, as a separate eth_call would
+    raw_results = multicall.functions.aggregate(targets, call_data).call()
+    assert raw_results == [testerchain.w3.eth.call({'to': approval_mock.address, 'data': data}) for data in call_data]
+
+    # Targets and call data must match
+    with pytest.raises((TransactionFailed, ValueError)):
+        multicall.functions.aggregate(targets, call_data[:-1]).call()
+
+
+@pytest.mark.slow
+def test_batch_call(approval_mock, batch_call):
+    getters = (approval_mock.functions.sender(),
+               approval_mock.functions.value(),
+               approval_mock.functions.tokenContract(),
+               approval_mock.functions.extraData())
+
+    # Aggregated results are decoded the same way as separate calls
+    assert batch_call(*getters) == [getter.call() for getter in getters]
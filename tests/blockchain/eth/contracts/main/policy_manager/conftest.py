@@ -17,24 +17,28 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import pytest
-from web3.contract import Contract
 from eth_utils import keccak
 
 
 secret = (123456).to_bytes(32, byteorder='big')
 
 
-@pytest.fixture()
+@pytest.fixture(scope='module')
 def escrow(testerchain, deploy_contract):
     # Creator deploys the escrow
     escrow, _ = deploy_contract('StakingEscrowForPolicyMock', 1)
     return escrow
 
 
-@pytest.fixture(params=[False, True])
+@pytest.fixture(scope='module', params=[False, True])
 def policy_manager(testerchain, escrow, request, deploy_contract):
     creator, client, bad_node, node1, node2, node3, *everyone_else = testerchain.client.accounts
 
+    # Escrow is shared by both variants, so everything set up after its deployment
+    # is reverted once the tests of this variant are done
+    ethereum_tester = testerchain.provider.ethereum_tester
+    snapshot_id = ethereum_tester.take_snapshot()
+
     # Creator deploys the policy manager
     contract, _ = deploy_contract('PolicyManager', escrow.address)
 
@@ -48,10 +52,7 @@ def policy_manager(testerchain, escrow, request, deploy_contract):
         dispatcher, _ = deploy_contract('Dispatcher', contract.address, secret_hash)
 
         # Deploy second version of the government contract
-        contract = testerchain.client.get_contract(
-            abi=contract.abi,
-            address=dispatcher.address,
-            ContractFactoryClass=Contract)
+        contract = type(contract)(address=dispatcher.address)
 
     tx = escrow.functions.setPolicyManager(contract.address).transact({'from': creator})
     testerchain.wait_for_receipt(tx)
@@ -67,4 +68,17 @@ def policy_manager(testerchain, escrow, request, deploy_contract):
     tx = escrow.functions.register(node3).transact()
     testerchain.wait_for_receipt(tx)
 
-    return contract
+    yield contract
+    ethereum_tester.revert_to_snapshot(snapshot_id)
+
+
+@pytest.fixture(autouse=True)
+def revert_chain_state(testerchain):
+    """
+    Contracts are deployed once per module, so every test
+    starts from the same snapshot and leaves no state behind.
+    """
+    ethereum_tester = testerchain.provider.ethereum_tester
+    snapshot_id = ethereum_tester.take_snapshot()
+    yield
+    ethereum_tester.revert_to_snapshot(snapshot_id)
@@ -16,12 +16,12 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
-import os
+from collections import defaultdict
+from itertools import count
 
 import pytest
 from eth_tester.exceptions import TransactionFailed
-from eth_utils import keccak, to_canonical_address
-from web3.contract import Contract
+from eth_utils import encode_hex, event_abi_to_log_topic, keccak, to_canonical_address
 
 from nucypher.blockchain.eth.interfaces import BlockchainInterface
 
@@ -40,13 +40,50 @@ MIN_REWARD_RATE_FIELD = 3
 
 secret = (123456).to_bytes(32, byteorder='big')
 secret2 = (654321).to_bytes(32, byteorder='big')
+secret_hash = keccak(secret)
+secret2_hash = keccak(secret2)
 
 
 POLICY_ID_LENGTH = 16
 
 
+def assert_rejected(*transactions):
+    """
+    Checks that each of the given (contract function, payload) transactions is rejected.
+    Transactions are simulated with eth_call, so rejected ones are not mined.
+    """
+    for contract_function, payload in transactions:
+        with pytest.raises((TransactionFailed, ValueError)):
+            contract_function.call(payload)
+
+
+def sign_revocation(testerchain, account, policy_id, node) -> bytes:
+    """Signs the revocation of the arrangement by the given account"""
+    return testerchain.client.sign_message(account=account, message=policy_id + to_canonical_address(node))
+
+
+def collect_events(testerchain, contract, from_block, *event_names) -> dict:
+    """
+    Fetches logs of the contract since the given block with a single request
+    and decodes them into lists of events by event name.
+    If event names are specified then only these events are requested.
+    """
+    event_abis = {event_abi_to_log_topic(abi): abi for abi in contract.abi if abi['type'] == 'event'}
+    filter_params = {'address': contract.address, 'fromBlock': from_block}
+    if event_names:
+        event_abis = {topic: abi for topic, abi in event_abis.items() if abi['name'] in event_names}
+        filter_params['topics'] = [[encode_hex(topic) for topic in event_abis]]
+    events = defaultdict(list)
+    for log in testerchain.w3.eth.getLogs(filter_params):
+        event_abi = event_abis.get(bytes(log['topics'][0]))
+        if event_abi is not None:
+            event = contract.events[event_abi['name']]()
+            events[event_abi['name']].append(event.processLog(log))
+    return events
+
+
 @pytest.mark.slow
-def test_create_revoke(testerchain, escrow, policy_manager):
+def test_create_revoke(testerchain, escrow, policy_manager, batch_call):
     creator, policy_sponsor, bad_node, node1, node2, node3, policy_owner, *everyone_else = testerchain.client.accounts
 
     rate = 20
@@ -54,65 +91,67 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     number_of_periods = 10
     value = rate * number_of_periods
 
-    policy_sponsor_balance = testerchain.client.get_balance(policy_sponsor)
-    policy_owner_balance = testerchain.client.get_balance(policy_owner)
-    policy_created_log = policy_manager.events.PolicyCreated.createFilter(fromBlock='latest')
-    arrangement_revoked_log = policy_manager.events.ArrangementRevoked.createFilter(fromBlock='latest')
-    policy_revoked_log = policy_manager.events.PolicyRevoked.createFilter(fromBlock='latest')
-    arrangement_refund_log = policy_manager.events.RefundForArrangement.createFilter(fromBlock='latest')
-    policy_refund_log = policy_manager.events.RefundForPolicy.createFilter(fromBlock='latest')
+    # Bind frequently used contract functions once
+    create_policy = policy_manager.functions.createPolicy
+    revoke_policy = policy_manager.functions.revokePolicy
+    revoke_arrangement = policy_manager.functions.revokeArrangement
+    revoke = policy_manager.functions.revoke
+    policies = policy_manager.functions.policies
+    get_arrangement_info = policy_manager.functions.getArrangementInfo
+    get_policy_owner = policy_manager.functions.getPolicyOwner
+
+    # Policy ids only have to be unique, so they are taken from a counter
+    policy_ids = (index.to_bytes(POLICY_ID_LENGTH, byteorder='big') for index in count(1))
+
+    policy_sponsor_balance, policy_owner_balance = testerchain.get_balances(policy_sponsor, policy_owner)
+    start_block = testerchain.w3.eth.blockNumber
 
     # Check registered nodes
-    assert 0 < policy_manager.functions.nodes(node1).call()[LAST_MINED_PERIOD_FIELD]
-    assert 0 < policy_manager.functions.nodes(node2).call()[LAST_MINED_PERIOD_FIELD]
-    assert 0 < policy_manager.functions.nodes(node3).call()[LAST_MINED_PERIOD_FIELD]
-    assert 0 == policy_manager.functions.nodes(bad_node).call()[LAST_MINED_PERIOD_FIELD]
-    current_timestamp = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
+    nodes = batch_call(*(policy_manager.functions.nodes(node) for node in (node1, node2, node3, bad_node)))
+    assert all(0 < node[LAST_MINED_PERIOD_FIELD] for node in nodes[:3])
+    assert 0 == nodes[3][LAST_MINED_PERIOD_FIELD]
+    current_timestamp = testerchain.get_blocktime()
     end_timestamp = current_timestamp + (number_of_periods - 1) * one_period
-    policy_id = os.urandom(POLICY_ID_LENGTH)
+    policy_id = next(policy_ids)
 
     # Try to create policy for bad (unregistered) node
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id, policy_sponsor, end_timestamp, [bad_node])\
-            .transact({'from': policy_sponsor, 'value': value})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id, policy_sponsor, end_timestamp, [node1, bad_node])\
-            .transact({'from': policy_sponsor, 'value': value})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((create_policy(policy_id, policy_sponsor, end_timestamp, [bad_node]),
+                     {'from': policy_sponsor, 'value': value}),
+                    (create_policy(policy_id, policy_sponsor, end_timestamp, [node1, bad_node]),
+                     {'from': policy_sponsor, 'value': value}))
 
     # Try to create policy with no ETH
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id, policy_sponsor, end_timestamp, [node1])\
-            .transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((create_policy(policy_id, policy_sponsor, end_timestamp, [node1]), {'from': policy_sponsor}))
 
     # Can't create policy using timestamp from the past
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id, policy_sponsor, current_timestamp -1, [node1])\
-            .transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((create_policy(policy_id, policy_sponsor, current_timestamp -1, [node1]), {'from': policy_sponsor}))
 
     # Create policy
-    tx = policy_manager.functions.createPolicy(policy_id, policy_sponsor, end_timestamp, [node1])\
+    tx = create_policy(policy_id, policy_sponsor, end_timestamp, [node1])\
         .transact({'from': policy_sponsor, 'value': value, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    current_timestamp = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
+    current_timestamp = testerchain.get_blocktime()
     # Check balances and policy info
-    assert value == testerchain.client.get_balance(policy_manager.address)
-    assert policy_sponsor_balance - 200 == testerchain.client.get_balance(policy_sponsor)
-    policy = policy_manager.functions.policies(policy_id).call()
+    manager_balance, sponsor_balance = testerchain.get_balances(policy_manager.address, policy_sponsor)
+    assert value == manager_balance
+    assert policy_sponsor_balance - 200 == sponsor_balance
+    policy, arrangements_length, arrangement, owner = batch_call(
+        policies(policy_id),
+        policy_manager.functions.getArrangementsLength(policy_id),
+        get_arrangement_info(policy_id, 0),
+        get_policy_owner(policy_id))
     assert policy_sponsor == policy[SPONSOR_FIELD]
     assert BlockchainInterface.NULL_ADDRESS == policy[OWNER_FIELD]
     assert rate == policy[RATE_FIELD]
     assert current_timestamp == policy[START_TIMESTAMP_FIELD]
     assert end_timestamp == policy[END_TIMESTAMP_FIELD]
     assert not policy[DISABLED_FIELD]
-    assert 1 == policy_manager.functions.getArrangementsLength(policy_id).call()
-    assert node1 == policy_manager.functions.getArrangementInfo(policy_id, 0).call()[0]
-    assert policy_sponsor == policy_manager.functions.getPolicyOwner(policy_id).call()
+    assert 1 == arrangements_length
+    assert node1 == arrangement[0]
+    assert policy_sponsor == owner
 
-    events = policy_created_log.get_all_entries()
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['PolicyCreated']
     assert 1 == len(events)
     event_args = events[0]['args']
     assert policy_id == event_args['policyId']
@@ -124,26 +163,23 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     assert 1 == event_args['numberOfNodes']
 
     # Can't create policy with the same id
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id, policy_sponsor, end_timestamp, [node1])\
-            .transact({'from': policy_sponsor, 'value': value})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((create_policy(policy_id, policy_sponsor, end_timestamp, [node1]),
+                     {'from': policy_sponsor, 'value': value}))
 
     # Only policy owner can revoke policy
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokePolicy(policy_id).transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
-    tx = policy_manager.functions.revokePolicy(policy_id).transact({'from': policy_sponsor, 'gas_price': 0})
+    assert_rejected((revoke_policy(policy_id), {'from': creator}))
+    tx = revoke_policy(policy_id).transact({'from': policy_sponsor, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    assert policy_manager.functions.policies(policy_id).call()[DISABLED_FIELD]
+    assert policies(policy_id).call()[DISABLED_FIELD]
 
-    events = policy_revoked_log.get_all_entries()
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['PolicyRevoked']
     assert 1 == len(events)
     event_args = events[0]['args']
     assert policy_id == event_args['policyId']
     assert policy_sponsor == event_args['sender']
     assert value == event_args['value']
-    events = arrangement_revoked_log.get_all_entries()
+    events = logs['ArrangementRevoked']
     assert 1 == len(events)
 
     event_args = events[0]['args']
@@ -153,37 +189,34 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     assert value == event_args['value']
 
     # Can't revoke again because policy and all arrangements are disabled
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokePolicy(policy_id).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id, node1).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_policy(policy_id), {'from': policy_sponsor}),
+                    (revoke_arrangement(policy_id, node1), {'from': policy_sponsor}))
 
     # Create new policy
     period = escrow.functions.getCurrentPeriod().call()
-    tx = escrow.functions.setDefaultRewardDelta(node1, period, number_of_periods + 1).transact()
-    testerchain.wait_for_receipt(tx)
-    tx = escrow.functions.setDefaultRewardDelta(node2, period, number_of_periods + 1).transact()
+    tx = escrow.functions.setDefaultRewardDeltas([node1, node2], period, number_of_periods + 1).transact()
     testerchain.wait_for_receipt(tx)
     end_timestamp = current_timestamp + (number_of_periods - 1) * one_period
-    policy_id_2 = os.urandom(POLICY_ID_LENGTH)
-    tx = policy_manager.functions.createPolicy(policy_id_2, policy_owner, end_timestamp, [node1, node2, node3])\
+    policy_id_2 = next(policy_ids)
+    tx = create_policy(policy_id_2, policy_owner, end_timestamp, [node1, node2, node3])\
         .transact({'from': policy_sponsor, 'value': 6 * value, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    current_timestamp = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
-    assert 6 * value == testerchain.client.get_balance(policy_manager.address)
-    assert policy_sponsor_balance - 6 * value == testerchain.client.get_balance(policy_sponsor)
-    policy = policy_manager.functions.policies(policy_id_2).call()
+    current_timestamp = testerchain.get_blocktime()
+    manager_balance, sponsor_balance = testerchain.get_balances(policy_manager.address, policy_sponsor)
+    assert 6 * value == manager_balance
+    assert policy_sponsor_balance - 6 * value == sponsor_balance
+    policy, owner = batch_call(policies(policy_id_2),
+                               get_policy_owner(policy_id_2))
     assert policy_sponsor == policy[SPONSOR_FIELD]
     assert policy_owner == policy[OWNER_FIELD]
     assert 2 * rate == policy[RATE_FIELD]
     assert current_timestamp == policy[START_TIMESTAMP_FIELD]
     assert end_timestamp == policy[END_TIMESTAMP_FIELD]
     assert not policy[DISABLED_FIELD]
-    assert policy_owner == policy_manager.functions.getPolicyOwner(policy_id_2).call()
+    assert policy_owner == owner
 
-    events = policy_created_log.get_all_entries()
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['PolicyCreated']
     assert 2 == len(events)
     event_args = events[1]['args']
     assert policy_id_2 == event_args['policyId']
@@ -195,32 +228,26 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     assert 3 == event_args['numberOfNodes']
 
     # Can't revoke nonexistent arrangement
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id_2, testerchain.client.accounts[6])\
-            .transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_arrangement(policy_id_2, policy_owner), {'from': policy_sponsor}))
     # Can't revoke null arrangement (also it's nonexistent)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id_2, BlockchainInterface.NULL_ADDRESS).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_arrangement(policy_id_2, BlockchainInterface.NULL_ADDRESS), {'from': policy_sponsor}))
 
     # Policy sponsor can't revoke policy, only owner can
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokePolicy(policy_id_2).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id_2, node1).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_policy(policy_id_2), {'from': policy_sponsor}),
+                    (revoke_arrangement(policy_id_2, node1), {'from': policy_sponsor}))
 
     # Revoke only one arrangement
-    tx = policy_manager.functions.revokeArrangement(policy_id_2, node1).transact({'from': policy_owner, 'gas_price': 0})
+    tx = revoke_arrangement(policy_id_2, node1).transact({'from': policy_owner, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    assert 4 * value == testerchain.client.get_balance(policy_manager.address)
-    assert policy_sponsor_balance - 4 * value == testerchain.client.get_balance(policy_sponsor)
-    assert not policy_manager.functions.policies(policy_id_2).call()[DISABLED_FIELD]
-    assert policy_owner_balance == testerchain.client.get_balance(policy_owner)
-
-    events = arrangement_revoked_log.get_all_entries()
+    manager_balance, sponsor_balance, owner_balance = \
+        testerchain.get_balances(policy_manager.address, policy_sponsor, policy_owner)
+    assert 4 * value == manager_balance
+    assert policy_sponsor_balance - 4 * value == sponsor_balance
+    assert not policies(policy_id_2).call()[DISABLED_FIELD]
+    assert policy_owner_balance == owner_balance
+
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['ArrangementRevoked']
     assert 2 == len(events)
     event_args = events[1]['args']
     assert policy_id_2 == event_args['policyId']
@@ -229,22 +256,20 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     assert 2 * value == event_args['value']
 
     # Can't revoke again because arrangement is disabled
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id_2, node1).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_arrangement(policy_id_2, node1), {'from': policy_sponsor}))
     # Can't revoke null arrangement (it's nonexistent)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id_2, BlockchainInterface.NULL_ADDRESS).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_arrangement(policy_id_2, BlockchainInterface.NULL_ADDRESS), {'from': policy_sponsor}))
 
     # Revoke policy with remaining arrangements
-    tx = policy_manager.functions.revokePolicy(policy_id_2).transact({'from': policy_owner, 'gas_price': 0})
+    tx = revoke_policy(policy_id_2).transact({'from': policy_owner, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    assert 0 == testerchain.client.get_balance(policy_manager.address)
-    assert policy_sponsor_balance == testerchain.client.get_balance(policy_sponsor)
-    assert policy_manager.functions.policies(policy_id_2).call()[DISABLED_FIELD]
+    manager_balance, sponsor_balance = testerchain.get_balances(policy_manager.address, policy_sponsor)
+    assert 0 == manager_balance
+    assert policy_sponsor_balance == sponsor_balance
+    assert policies(policy_id_2).call()[DISABLED_FIELD]
 
-    events = arrangement_revoked_log.get_all_entries()
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['ArrangementRevoked']
     assert 4 == len(events)
     event_args = events[2]['args']
     assert policy_id_2 == event_args['policyId']
@@ -257,7 +282,7 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     assert policy_owner == event_args['sender']
     assert node3 == event_args['node']
     assert 2 * value == event_args['value']
-    events = policy_revoked_log.get_all_entries()
+    events = logs['PolicyRevoked']
     assert 2 == len(events)
     event_args = events[1]['args']
     assert policy_id_2 == event_args['policyId']
@@ -265,60 +290,52 @@ def test_create_revoke(testerchain, escrow, policy_manager):
     assert 4 * value == event_args['value']
 
     # Can't revoke policy again because policy and all arrangements are disabled
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokePolicy(policy_id_2).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revokeArrangement(policy_id_2, node1).transact({'from': policy_sponsor})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((revoke_policy(policy_id_2), {'from': policy_sponsor}),
+                    (revoke_arrangement(policy_id_2, node1), {'from': policy_sponsor}))
 
     # Can't create policy with wrong ETH value - when reward is not calculated by formula:
     # numberOfNodes * rewardRate * numberOfPeriods
-    policy_id_3 = os.urandom(POLICY_ID_LENGTH)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id_3, policy_sponsor, end_timestamp, [node1])\
-            .transact({'from': policy_sponsor, 'value': 11})
-        testerchain.wait_for_receipt(tx)
+    policy_id_3 = next(policy_ids)
+    assert_rejected((create_policy(policy_id_3, policy_sponsor, end_timestamp, [node1]),
+                     {'from': policy_sponsor, 'value': 11}))
 
     # Set minimum reward rate for nodes
-    tx = policy_manager.functions.setMinRewardRate(10).transact({'from': node1})
-    testerchain.wait_for_receipt(tx)
-    tx = policy_manager.functions.setMinRewardRate(20).transact({'from': node2})
-    testerchain.wait_for_receipt(tx)
-    assert 10 == policy_manager.functions.nodes(node1).call()[MIN_REWARD_RATE_FIELD]
-    assert 20 == policy_manager.functions.nodes(node2).call()[MIN_REWARD_RATE_FIELD]
+    testerchain.transact_batch([(policy_manager.functions.setMinRewardRate(10), {'from': node1}),
+                                (policy_manager.functions.setMinRewardRate(20), {'from': node2})])
+    node1_info, node2_info = batch_call(policy_manager.functions.nodes(node1), policy_manager.functions.nodes(node2))
+    assert 10 == node1_info[MIN_REWARD_RATE_FIELD]
+    assert 20 == node2_info[MIN_REWARD_RATE_FIELD]
 
     # Try to create policy with low rate
-    current_timestamp = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
+    current_timestamp = testerchain.get_blocktime()
     end_timestamp = current_timestamp + 10
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id_3, policy_sponsor, end_timestamp, [node1])\
-            .transact({'from': policy_sponsor, 'value': 5})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.createPolicy(policy_id_3, policy_sponsor, end_timestamp, [node1, node2])\
-            .transact({'from': policy_sponsor, 'value': 30})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((create_policy(policy_id_3, policy_sponsor, end_timestamp, [node1]),
+                     {'from': policy_sponsor, 'value': 5}),
+                    (create_policy(policy_id_3, policy_sponsor, end_timestamp, [node1, node2]),
+                     {'from': policy_sponsor, 'value': 30}))
 
     # Create new policy
     end_timestamp = current_timestamp + (number_of_periods - 1) * one_period
-    tx = policy_manager.functions.createPolicy(
+    tx = create_policy(
         policy_id_3, BlockchainInterface.NULL_ADDRESS, end_timestamp, [node1, node2]) \
         .transact({'from': policy_sponsor, 'value': 2 * value, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    current_timestamp = testerchain.w3.eth.getBlock(block_identifier='latest').timestamp
-    assert 2 * value == testerchain.client.get_balance(policy_manager.address)
-    assert policy_sponsor_balance - 2 * value == testerchain.client.get_balance(policy_sponsor)
-    policy = policy_manager.functions.policies(policy_id_3).call()
+    current_timestamp = testerchain.get_blocktime()
+    manager_balance, sponsor_balance = testerchain.get_balances(policy_manager.address, policy_sponsor)
+    assert 2 * value == manager_balance
+    assert policy_sponsor_balance - 2 * value == sponsor_balance
+    policy, owner = batch_call(policies(policy_id_3),
+                               get_policy_owner(policy_id_3))
     assert policy_sponsor == policy[SPONSOR_FIELD]
     assert BlockchainInterface.NULL_ADDRESS == policy[OWNER_FIELD]
     assert rate == policy[RATE_FIELD]
     assert current_timestamp == policy[START_TIMESTAMP_FIELD]
     assert end_timestamp == policy[END_TIMESTAMP_FIELD]
     assert not policy[DISABLED_FIELD]
-    assert policy_sponsor == policy_manager.functions.getPolicyOwner(policy_id_3).call()
+    assert policy_sponsor == owner
 
-    events = policy_created_log.get_all_entries()
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['PolicyCreated']
     assert 3 == len(events)
     event_args = events[2]['args']
     assert policy_id_3 == event_args['policyId']
@@ -331,94 +348,81 @@ def test_create_revoke(testerchain, escrow, policy_manager):
 
     # Revocation using signature
 
-    data = policy_id_3 + to_canonical_address(node1)
-    wrong_signature = testerchain.client.sign_message(account=creator, message=data)
+    wrong_signature = sign_revocation(testerchain, creator, policy_id_3, node1)
     # Only owner's signature can be used
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revoke(policy_id_3, node1, wrong_signature)\
-            .transact({'from': policy_sponsor, 'gas_price': 0})
-        testerchain.wait_for_receipt(tx)
-    signature = testerchain.client.sign_message(account=policy_sponsor, message=data)
-    tx = policy_manager.functions.revoke(policy_id_3, node1, signature)\
+    assert_rejected((revoke(policy_id_3, node1, wrong_signature), {'from': policy_sponsor}))
+    signature = sign_revocation(testerchain, policy_sponsor, policy_id_3, node1)
+    tx = revoke(policy_id_3, node1, signature)\
         .transact({'from': policy_sponsor, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    assert value == testerchain.client.get_balance(policy_manager.address)
-    assert policy_sponsor_balance - value == testerchain.client.get_balance(policy_sponsor)
-    assert not policy_manager.functions.policies(policy_id_3).call()[DISABLED_FIELD]
-    assert BlockchainInterface.NULL_ADDRESS == policy_manager.functions.getArrangementInfo(policy_id_3, 0).call()[0]
-    assert node2 == policy_manager.functions.getArrangementInfo(policy_id_3, 1).call()[0]
-
-    data = policy_id_3 + to_canonical_address(BlockchainInterface.NULL_ADDRESS)
-    signature = testerchain.client.sign_message(account=policy_sponsor, message=data)
-    tx = policy_manager.functions.revoke(policy_id_3, BlockchainInterface.NULL_ADDRESS, signature)\
+    manager_balance, sponsor_balance = testerchain.get_balances(policy_manager.address, policy_sponsor)
+    assert value == manager_balance
+    assert policy_sponsor_balance - value == sponsor_balance
+    policy, arrangement_1, arrangement_2 = batch_call(policies(policy_id_3),
+                                                      get_arrangement_info(policy_id_3, 0),
+                                                      get_arrangement_info(policy_id_3, 1))
+    assert not policy[DISABLED_FIELD]
+    assert BlockchainInterface.NULL_ADDRESS == arrangement_1[0]
+    assert node2 == arrangement_2[0]
+
+    signature = sign_revocation(testerchain, policy_sponsor, policy_id_3, BlockchainInterface.NULL_ADDRESS)
+    tx = revoke(policy_id_3, BlockchainInterface.NULL_ADDRESS, signature)\
         .transact({'from': creator, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    assert policy_manager.functions.policies(policy_id_3).call()[DISABLED_FIELD]
+    assert policies(policy_id_3).call()[DISABLED_FIELD]
 
     # Create new policy
     end_timestamp = current_timestamp + (number_of_periods - 1) * one_period
-    policy_id_4 = os.urandom(POLICY_ID_LENGTH)
-    tx = policy_manager.functions.createPolicy(policy_id_4, policy_owner, end_timestamp, [node1, node2, node3]) \
+    policy_id_4 = next(policy_ids)
+    tx = create_policy(policy_id_4, policy_owner, end_timestamp, [node1, node2, node3]) \
         .transact({'from': policy_sponsor, 'value': 3 * value, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
 
-    data = policy_id_4 + to_canonical_address(BlockchainInterface.NULL_ADDRESS)
-    wrong_signature = testerchain.client.sign_message(account=policy_sponsor, message=data)
+    wrong_signature = sign_revocation(testerchain, policy_sponsor, policy_id_4, BlockchainInterface.NULL_ADDRESS)
     # Only owner's signature can be used
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = policy_manager.functions.revoke(policy_id_4, BlockchainInterface.NULL_ADDRESS, wrong_signature)\
-            .transact({'from': policy_owner, 'gas_price': 0})
-        testerchain.wait_for_receipt(tx)
-    signature = testerchain.client.sign_message(account=policy_owner, message=data)
-    tx = policy_manager.functions.revoke(policy_id_4, BlockchainInterface.NULL_ADDRESS, signature)\
+    assert_rejected((revoke(policy_id_4, BlockchainInterface.NULL_ADDRESS, wrong_signature), {'from': policy_owner}))
+    signature = sign_revocation(testerchain, policy_owner, policy_id_4, BlockchainInterface.NULL_ADDRESS)
+    tx = revoke(policy_id_4, BlockchainInterface.NULL_ADDRESS, signature)\
         .transact({'from': creator, 'gas_price': 0})
     testerchain.wait_for_receipt(tx)
-    assert policy_manager.functions.policies(policy_id_4).call()[DISABLED_FIELD]
+    assert policies(policy_id_4).call()[DISABLED_FIELD]
 
-    events = policy_revoked_log.get_all_entries()
+    logs = collect_events(testerchain, policy_manager, start_block)
+    events = logs['PolicyRevoked']
     assert 4 == len(events)
-    events = arrangement_revoked_log.get_all_entries()
+    events = logs['ArrangementRevoked']
     assert 9 == len(events)
 
-    events = arrangement_refund_log.get_all_entries()
+    events = logs['RefundForArrangement']
     assert 0 == len(events)
-    events = policy_refund_log.get_all_entries()
+    events = logs['RefundForPolicy']
     assert 0 == len(events)
 
 
 @pytest.mark.slow
-def test_upgrading(testerchain, deploy_contract):
+def test_upgrading(testerchain, escrow, deploy_contract):
     creator = testerchain.client.accounts[0]
 
-    secret_hash = keccak(secret)
-    secret2_hash = keccak(secret2)
-
     # Only escrow contract is allowed in PolicyManager constructor
     with pytest.raises((TransactionFailed, ValueError)):
         deploy_contract('PolicyManager', creator)
 
     # Deploy contracts
-    escrow1, _ = deploy_contract('StakingEscrowForPolicyMock', 1)
     escrow2, _ = deploy_contract('StakingEscrowForPolicyMock', 1)
-    address1 = escrow1.address
+    address1 = escrow.address
     address2 = escrow2.address
     contract_library_v1, _ = deploy_contract('PolicyManager', address1)
+    # Dispatcher logs are collected starting from its deployment
+    start_block = testerchain.w3.eth.blockNumber
     dispatcher, _ = deploy_contract('Dispatcher', contract_library_v1.address, secret_hash)
 
     # Deploy second version of the contract
     contract_library_v2, _ = deploy_contract('PolicyManagerV2Mock', address2)
-    contract = testerchain.client.get_contract(
-        abi=contract_library_v2.abi,
-        address=dispatcher.address,
-        ContractFactoryClass=Contract)
+    contract = type(contract_library_v2)(address=dispatcher.address)
 
     # Can't call `finishUpgrade` and `verifyState` methods outside upgrade lifecycle
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = contract_library_v1.functions.finishUpgrade(contract.address).transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = contract_library_v1.functions.verifyState(contract.address).transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((contract_library_v1.functions.finishUpgrade(contract.address), {'from': creator}),
+                    (contract_library_v1.functions.verifyState(contract.address), {'from': creator}))
 
     # Upgrade to the second version
     assert address1 == contract.functions.escrow().call()
@@ -434,14 +438,10 @@ def test_upgrading(testerchain, deploy_contract):
 
     # Can't upgrade to the previous version or to the bad version
     contract_library_bad, _ = deploy_contract('PolicyManagerBad', address2)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = dispatcher.functions.upgrade(contract_library_v1.address, secret2, secret_hash)\
-            .transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = dispatcher.functions.upgrade(contract_library_bad.address, secret2, secret_hash)\
-            .transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((dispatcher.functions.upgrade(contract_library_v1.address, secret2, secret_hash),
+                     {'from': creator}),
+                    (dispatcher.functions.upgrade(contract_library_bad.address, secret2, secret_hash),
+                     {'from': creator}))
 
     # But can rollback
     tx = dispatcher.functions.rollback(secret2, secret_hash).transact({'from': creator})
@@ -449,17 +449,14 @@ def test_upgrading(testerchain, deploy_contract):
     assert contract_library_v1.address == dispatcher.functions.target().call()
     assert address1 == contract.functions.escrow().call()
     # After rollback new ABI is unavailable
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = contract.functions.setValueToCheck(2).transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((contract.functions.setValueToCheck(2), {'from': creator}))
 
     # Try to upgrade to the bad version
-    with pytest.raises((TransactionFailed, ValueError)):
-        tx = dispatcher.functions.upgrade(contract_library_bad.address, secret, secret2_hash)\
-            .transact({'from': creator})
-        testerchain.wait_for_receipt(tx)
+    assert_rejected((dispatcher.functions.upgrade(contract_library_bad.address, secret, secret2_hash),
+                     {'from': creator}))
 
-    events = dispatcher.events.StateVerified.createFilter(fromBlock=0).get_all_entries()
+    logs = collect_events(testerchain, dispatcher, start_block, 'StateVerified', 'UpgradeFinished')
+    events = logs['StateVerified']
     assert 4 == len(events)
     event_args = events[0]['args']
     assert contract_library_v1.address == event_args['testTarget']
@@ -472,7 +469,7 @@ def test_upgrading(testerchain, deploy_contract):
     assert contract_library_v2.address == event_args['testTarget']
     assert creator == event_args['sender']
 
-    events = dispatcher.events.UpgradeFinished.createFilter(fromBlock=0).get_all_entries()
+    events = logs['UpgradeFinished']
     assert 3 == len(events)
     event_args = events[0]['args']
     assert contract_library_v1.address == event_args['target']
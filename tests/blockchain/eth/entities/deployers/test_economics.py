@@ -19,8 +19,29 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 from decimal import Decimal, localcontext
 from math import log
 
+import pytest
+
 from nucypher.blockchain.economics import LOG2, StandardTokenEconomics
 
+_1E9 = Decimal(1_000_000_000)
+_DEC_HALF = Decimal('0.5')
+_DEC_TWO = Decimal(2)
+_DEC_365 = Decimal(365)
+_LOG2 = log(2)
+_K2_COEFF_NUMER = 365 * 365
+
+
+def day_one_rewards(delta, k1, k2):
+    """Reward rates in day 1 for a fully locked stake and for a stake which is about to unlock"""
+    initial_rate = delta * (k1 + 365) / k2
+    initial_rate_small = delta * k1 / k2
+    return initial_rate, initial_rate_small
+
+
+@pytest.fixture(scope='module')
+def default_economics():
+    return StandardTokenEconomics()
+
 
 def test_rough_economics():
     """
@@ -41,26 +62,31 @@ def test_rough_economics():
                                initial_inflation=1,
                                halving_delay=2,
                                reward_saturation=1,
-                               small_stake_multiplier=Decimal(0.5))
+                               small_stake_multiplier=_DEC_HALF)
 
-    assert float(round(e.erc20_total_supply / Decimal(1e9), 2)) == 3.89  # As per economics paper
+    assert float(round(e.erc20_total_supply / _1E9, 2)) == 3.89  # As per economics paper
 
-    # Check that we have correct numbers in day 1
-    initial_rate = (e.erc20_total_supply - e.initial_supply) * (e.locked_periods_coefficient + 365) / e.staking_coefficient
-    assert int(initial_rate) == int(e.initial_inflation * e.initial_supply / 365)
+    # Only integer accuracy is checked here, so native floats are enough
+    total_supply, initial_supply, k1, k2 = map(float, (e.erc20_total_supply,
+                                                       e.initial_supply,
+                                                       e.locked_periods_coefficient,
+                                                       e.staking_coefficient))
 
-    initial_rate_small = (e.erc20_total_supply - e.initial_supply) * e.locked_periods_coefficient / e.staking_coefficient
+    # Check that we have correct numbers in day 1
+    delta = total_supply - initial_supply
+    initial_rate, initial_rate_small = day_one_rewards(delta, k1, k2)
+    assert int(initial_rate) == int(e.initial_inflation * initial_supply / 365)
     assert int(initial_rate_small) == int(initial_rate / 2)
 
     # Sanity check that total and reward supply calculated correctly
-    assert int(LOG2 / (e.token_halving * 365) * (e.erc20_total_supply - e.initial_supply)) == int(initial_rate)
-    assert int(e.reward_supply) == int(e.erc20_total_supply - Decimal(int(1e9)))
+    assert int(_LOG2 / (e.token_halving * 365) * delta) == int(initial_rate)
+    assert int(e.reward_supply) == int(e.erc20_total_supply - _1E9)
 
     # Sanity check for locked_periods_coefficient (k1) and staking_coefficient (k2)
     assert e.locked_periods_coefficient * e.token_halving == e.staking_coefficient * LOG2 * e.small_stake_multiplier / 365
 
 
-def test_exact_economics():
+def test_exact_economics(default_economics):
     """
     Formula for staking in one period:
     (totalSupply - currentSupply) * (lockedValue / totalLockedValue) * (k1 + allLockedPeriods) / k2
@@ -94,7 +120,7 @@ def test_exact_economics():
     expected_locked_periods_coefficient = 365
     expected_staking_coefficient = 768812
 
-    assert expected_locked_periods_coefficient * halving == round(expected_staking_coefficient * log(2) * multiplier / 365)
+    assert expected_locked_periods_coefficient * halving == round(expected_staking_coefficient * _LOG2 * multiplier / 365)
 
     #
     # Sanity
@@ -118,7 +144,7 @@ def test_exact_economics():
         assert Decimal(expected_total_supply) / expected_initial_supply == expected_supply_ratio
         assert expected_reward_supply == expected_total_supply - expected_initial_supply
         assert reward_saturation * 365 * multiplier == expected_locked_periods_coefficient * (1 - multiplier)
-        assert int(365 ** 2 * reward_saturation * halving / log(2) / (1-multiplier)) == expected_staking_coefficient
+        assert int(_K2_COEFF_NUMER * reward_saturation * halving / _LOG2 / (1-multiplier)) == expected_staking_coefficient
 
     # After sanity checking, assemble expected test deployment parameters
     expected_deployment_parameters = (24,       # Hours in single period
@@ -134,7 +160,7 @@ def test_exact_economics():
     #
 
     # Check creation
-    e = StandardTokenEconomics()
+    e = default_economics
 
     with localcontext() as ctx:
         ctx.prec = StandardTokenEconomics._precision
@@ -144,14 +170,13 @@ def test_exact_economics():
         assert e.erc20_total_supply == expected_total_supply
 
         # Check reward rates
-        initial_rate = Decimal((e.erc20_total_supply - e.initial_supply) * (e.locked_periods_coefficient + 365) / e.staking_coefficient)
-        assert initial_rate == Decimal((e.initial_inflation * e.initial_supply) / 365)
-
-        initial_rate_small = (e.erc20_total_supply - e.initial_supply) * e.locked_periods_coefficient / e.staking_coefficient
-        assert Decimal(initial_rate_small) == Decimal(initial_rate / 2)
+        delta = e.erc20_total_supply - e.initial_supply
+        initial_rate, initial_rate_small = day_one_rewards(delta, e.locked_periods_coefficient, e.staking_coefficient)
+        assert initial_rate == e.initial_inflation * e.initial_supply / _DEC_365
+        assert initial_rate_small == initial_rate / _DEC_TWO
 
         # Check reward supply
-        assert Decimal(LOG2 / (e.token_halving * 365) * (e.erc20_total_supply - e.initial_supply)) == initial_rate
+        assert LOG2 / (e.token_halving * 365) * delta == initial_rate
         assert e.reward_supply == expected_total_supply - expected_initial_supply
 
         # Check deployment parameters
@@ -181,15 +206,14 @@ def test_exact_economics():
             todays_supply = tomorrows_supply
 
 
-def test_economic_parameter_aliases():
+def test_economic_parameter_aliases(default_economics):
 
-    e = StandardTokenEconomics()
+    e = default_economics
 
     assert e.locked_periods_coefficient == 365
     assert int(e.staking_coefficient) == 768812
     assert e.maximum_rewarded_periods == 365
 
     deployment_params = e.staking_deployment_parameters
-    assert isinstance(deployment_params, tuple)
-    for parameter in deployment_params:
-        assert isinstance(parameter, int)
+    assert isinstance(deployment_params, tuple) and len(deployment_params) == 8
+    assert all(type(parameter) is int for parameter in deployment_params)
@@ -18,6 +18,7 @@ import os
 from os.path import dirname, abspath
 
 import pytest
+from eth_utils import ValidationError
 
 from nucypher.blockchain.eth.interfaces import BlockchainDeployerInterface, BlockchainInterfaceFactory
 from nucypher.blockchain.eth.registry import InMemoryContractRegistry
@@ -91,6 +92,30 @@ def test_testerchain_creation(testerchain, another_testerchain):
             _receipt = chain.wait_for_receipt(txhash)
 
 
+def test_transact_batch(testerchain, deploy_contract):
+    contract, _ = deploy_contract('ReceiveApprovalMethodMock')
+    senders = testerchain.unassigned_accounts[:3]
+
+    def receive_approval(sender):
+        return contract.functions.receiveApproval(sender, 1, contract.address, b'')
+
+    # Transactions from distinct senders are mined together, sharing the block gas limit
+    receipts = testerchain.transact_batch([(receive_approval(sender), {'from': sender}) for sender in senders])
+    assert len({receipt['blockNumber'] for receipt in receipts}) == 1
+    assert all(receipt['status'] == 1 for receipt in receipts)
+
+    # eth-tester would keep only the last queued transaction of the same sender
+    with pytest.raises(ValueError):
+        testerchain.transact_batch([(receive_approval(senders[0]), {'from': senders[0]})] * 2)
+
+    # Auto-mining is restored even if the queued transactions don't fit into a block
+    with pytest.raises(ValidationError):
+        with testerchain.single_block():
+            for sender in senders[:2]:
+                receive_approval(sender).transact({'from': sender})
+    assert testerchain.provider.ethereum_tester.auto_mine_transactions
+
+
 def test_multiversion_contract():
     # Prepare compiler
     base_dir = os.path.join(dirname(abspath(__file__)), "contracts", "multiversion")
@@ -65,3 +65,28 @@ def test_multi_versions():
     assert "v1.2.3" in contract_data
     assert "v1.1.4" in contract_data
     assert contract_data["v1.2.3"]["devdoc"] != contract_data["v1.1.4"]["devdoc"]
+
+
+def test_source_digest():
+    base_dir = os.path.join(dirname(abspath(__file__)), "contracts", "multiversion")
+    root_dir = SolidityCompiler.default_contract_dir()
+    v1_compiler = SolidityCompiler(source_dirs=[SourceDirs(root_dir, {os.path.join(base_dir, "v1")})])
+    v2_compiler = SolidityCompiler(source_dirs=[SourceDirs(root_dir, {os.path.join(base_dir, "v2")})])
+
+    # Digest depends only on the sources, so it's stable across compiler instances
+    assert v1_compiler.source_digest() == v1_compiler.source_digest()
+    assert v1_compiler.source_digest() == SolidityCompiler(source_dirs=v1_compiler.source_dirs).source_digest()
+    assert v1_compiler.source_digest() != v2_compiler.source_digest()
+
+
+def test_source_digest_covers_libraries(tmpdir):
+    contracts_dir = tmpdir.mkdir("contracts")
+    contracts_dir.join("Token.sol").write('import "zeppelin/math/SafeMath.sol";\ncontract Token {}\n')
+    library = tmpdir.mkdir("zeppelin").mkdir("math").join("SafeMath.sol")
+    library.write("library SafeMath {}\n")
+    compiler = SolidityCompiler(source_dirs=[SourceDirs(str(tmpdir))])
+    digest = compiler.source_digest()
+
+    # Libraries are only compiled through imports, but still change the compilation output
+    library.write("library SafeMath { uint256 constant ONE = 1; }\n")
+    assert compiler.source_digest() != digest
@@ -15,10 +15,16 @@ You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
+import hashlib
+import os
+from collections import defaultdict
+from functools import lru_cache
+
 import pytest
 
 from nucypher.characters.control.emitters import WebEmitter
 from nucypher.cli.config import GroupGeneralConfig
+from nucypher.config.constants import BASE_DIR
 from nucypher.crypto.powers import TransactingPower
 from nucypher.utilities.logging import GlobalLoggerSettings
 from nucypher.utilities.sandbox.constants import INSECURE_DEVELOPMENT_PASSWORD
@@ -34,6 +40,9 @@ TransactingPower.lock_account = lambda *a, **k: True
 # Disable any hardcoded preferred teachers during tests.
 TEACHER_NODES = dict()
 
+# Cache keys of content digests recorded for passing tests marked with 'unchanged'
+UNCHANGED_CACHE_KEY = 'nucypher/unchanged/{nodeid}'
+
 
 ##########################################
 
@@ -85,12 +94,18 @@ def pytest_addoption(parser):
                      action="store_true",
                      default=False,
                      help="run tests even if they are marked as nightly")
+    parser.addoption("--skip-unchanged",
+                     action="store_true",
+                     default=False,
+                     help="skip tests marked as unchanged that already passed against the same sources")
 
 
 def pytest_configure(config):
     message = "{0}: mark test as {0} to run (skipped by default, use '{1}' to include these tests)"
     config.addinivalue_line("markers", message.format("slow", "--runslow"))
     config.addinivalue_line("markers", message.format("nightly", "--run-nightly"))
+    config.addinivalue_line("markers", "unchanged: skip the test with '--skip-unchanged' if it already passed "
+                                       "against the same test module, solidity and ethereum sources")
 
 
 def pytest_collection_modifyitems(config, items):
@@ -114,6 +129,13 @@ def pytest_collection_modifyitems(config, items):
             if marker in item.keywords:
                 item.add_marker(skip_reason)
 
+    #
+    # Handle unchanged tests marker
+    #
+
+    if config.getoption("--skip-unchanged"):
+        skip_unchanged_tests(config, items)
+
     #
     # Handle Log Level
     #
@@ -125,3 +147,84 @@ def pytest_collection_modifyitems(config, items):
     GlobalLoggerSettings.start_text_file_logging()
     GlobalLoggerSettings.start_json_file_logging()
 
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == 'call' and report.passed and item.get_closest_marker('unchanged'):
+        item.config.cache.set(UNCHANGED_CACHE_KEY.format(nodeid=item.nodeid), content_digest(item))
+
+
+def update_digest(digest, path: str) -> None:
+    """Feeds a source file into the digest along with its path relative to the project root"""
+    digest.update(os.path.relpath(path, BASE_DIR).encode())
+    with open(path, 'rb') as source_file:
+        digest.update(source_file.read())
+
+
+@lru_cache(maxsize=None)
+def sources_digest() -> str:
+    """
+    Digest of all solidity sources used in tests, including the test helper contracts, of the python sources
+    they are exercised with (blockchain, crypto and sandbox packages) and of the shared test fixtures
+    """
+    from nucypher.utilities.sandbox.blockchain import TesterBlockchain
+    digest = hashlib.sha256(TesterBlockchain._compiler.source_digest().encode())
+    for package in ('blockchain', 'crypto', os.path.join('utilities', 'sandbox')):
+        sources_dir = os.path.join(BASE_DIR, 'nucypher', package)
+        for root, _dirs, filenames in sorted(os.walk(sources_dir)):
+            for filename in sorted(filenames):
+                if filename.endswith('.py'):
+                    update_digest(digest, os.path.join(root, filename))
+    # Test helper contracts are compiled by the tests themselves, e.g. the mocks and the multiversion sources
+    for root, _dirs, filenames in sorted(os.walk(os.path.join(BASE_DIR, 'tests'))):
+        for filename in sorted(filenames):
+            if filename.endswith('.sol'):
+                update_digest(digest, os.path.join(root, filename))
+    update_digest(digest, os.path.join(BASE_DIR, 'tests', 'fixtures.py'))
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def conftests_digest(directory: str) -> str:
+    """Digest of every conftest.py applying to tests of the directory, up to the tests root"""
+    digest = hashlib.sha256()
+    tests_root = os.path.join(BASE_DIR, 'tests')
+    while True:
+        conftest = os.path.join(directory, 'conftest.py')
+        if os.path.isfile(conftest):
+            update_digest(digest, conftest)
+        if os.path.samefile(directory, tests_root) or os.path.dirname(directory) == directory:
+            break
+        directory = os.path.dirname(directory)
+    return digest.hexdigest()
+
+
+def content_digest(item) -> str:
+    """Digest of the test module of the item along with its conftests and all sources it exercises"""
+    digest = hashlib.sha256(sources_digest().encode())
+    module_path = str(item.fspath)
+    digest.update(conftests_digest(os.path.dirname(module_path)).encode())
+    with open(module_path, 'rb') as test_module:
+        digest.update(test_module.read())
+    return digest.hexdigest()
+
+
+def skip_unchanged_tests(config, items):
+    """
+    Skips tests marked as unchanged if every marked test of their module already
+    passed against the same content, since such tests may depend on each other.
+    """
+    modules = defaultdict(list)
+    for item in items:
+        if item.get_closest_marker('unchanged'):
+            modules[str(item.fspath)].append(item)
+
+    skip_reason = pytest.mark.skip(reason="unchanged since the last passing run")
+    for module_items in modules.values():
+        digest = content_digest(module_items[0])
+        if all(config.cache.get(UNCHANGED_CACHE_KEY.format(nodeid=item.nodeid), None) == digest
+               for item in module_items):
+            for item in module_items:
+                item.add_marker(skip_reason)
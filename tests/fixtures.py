@@ -24,7 +24,7 @@ from typing import Union
 
 import maya
 import pytest
-from eth_utils import to_checksum_address
+from eth_utils import function_abi_to_4byte_selector, to_checksum_address
 from sqlalchemy.engine import create_engine
 from twisted.logger import Logger
 from umbral import pre
@@ -423,7 +423,7 @@ def test_registry():
     return registry
 
 
-def _make_testerchain():
+def _make_testerchain(compilation_cache=None):
     """
     https://github.com/ethereum/eth-tester     # available-backends
     """
@@ -441,7 +441,7 @@ def _make_testerchain():
     web3.eth.get_buffered_gas_estimate = _get_buffered_gas_estimate
 
     # Create the blockchain
-    testerchain = TesterBlockchain(eth_airdrop=True, free_transactions=True)
+    testerchain = TesterBlockchain(eth_airdrop=True, free_transactions=True, compilation_cache=compilation_cache)
     BlockchainInterfaceFactory.register_interface(interface=testerchain)
 
     # Mock TransactingPower Consumption (Deployer)
@@ -452,8 +452,9 @@ def _make_testerchain():
 
 
 @pytest.fixture(scope='session')
-def _testerchain():
-    testerchain = _make_testerchain()
+def _testerchain(request):
+    # Compiled contracts are kept in the pytest cache between runs while solidity sources are unchanged
+    testerchain = _make_testerchain(compilation_cache=request.config.cache)
     yield testerchain
 
 
@@ -897,6 +898,35 @@ def deploy_contract(testerchain, test_registry):
     return wrapped
 
 
+@pytest.fixture(scope='module')
+def batch_call(testerchain, deploy_contract):
+    multicall, _ = deploy_contract('Multicall')
+    codec = testerchain.w3.codec
+
+    def encode(contract_function) -> bytes:
+        input_types = [argument['type'] for argument in contract_function.abi['inputs']]
+        selector = function_abi_to_4byte_selector(contract_function.abi)
+        return selector + codec.encode_abi(input_types, contract_function.args)
+
+    def decode(contract_function, raw_result: bytes):
+        output_types = [output['type'] for output in contract_function.abi['outputs']]
+        output_data = codec.decode_abi(output_types, raw_result)
+        # Checksum decoded addresses the same way as ContractFunction.call does
+        output_data = [to_checksum_address(value) if output_type == 'address' else value
+                       for output_type, value in zip(output_types, output_data)]
+        return output_data[0] if len(output_data) == 1 else output_data
+
+    def aggregate(*contract_functions) -> list:
+        """Executes a group of independent read-only contract calls at once and returns their results in order"""
+        targets = [contract_function.address for contract_function in contract_functions]
+        call_data = [encode(contract_function) for contract_function in contract_functions]
+        raw_results = multicall.functions.aggregate(targets, call_data).call()
+        return [decode(contract_function, raw_result)
+                for contract_function, raw_result in zip(contract_functions, raw_results)]
+
+    return aggregate
+
+
 @pytest.fixture(scope='module')
 def mock_registry_filepath(testerchain, agency, test_registry):
     # Fake the source contract registry